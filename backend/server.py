@@ -1,29 +1,45 @@
 from fastapi import FastAPI, APIRouter, HTTPException
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.middleware.gzip import GZipMiddleware
+from pymongo import ASCENDING, DESCENDING, AsyncMongoClient, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from pymongo.write_concern import WriteConcern
+from bson import ObjectId
+from bson.errors import InvalidId
 import os
 import logging
 from pathlib import Path
+from types import MappingProxyType
 from pydantic import BaseModel, Field
-from typing import List, Optional
-import uuid
+from typing import Dict, List, Optional, Tuple
+import secrets
+from uuid_utils import uuid7
 from datetime import datetime, timedelta
-import requests
+import httpx
 import json
-import base64
-from fastapi import Cookie, Response
+import orjson
+import asyncio
+import contextlib
+import hashlib
+import re
+from string import Template
+from cachetools import LRUCache, TTLCache
+from fastapi import Cookie, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection, opened in the startup hook on the serving event loop so each
+# worker (and each reload/test loop) gets its own pool; also exposed on app.state
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+client: Optional[AsyncMongoClient] = None
+db = None
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -31,10 +47,16 @@ api_router = APIRouter(prefix="/api")
 # Gemini API configuration
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+GEMINI_STREAM_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:streamGenerateContent"
+GEMINI_MAX_CONCURRENCY = int(os.environ.get('GEMINI_MAX_CONCURRENCY', '16'))
+
+def new_id() -> str:
+    """Time-ordered UUIDv7 string for document ids (keeps the id indexes append-mostly)"""
+    return str(uuid7())
 
 # Define Models
 class StatusCheck(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     client_name: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
@@ -42,7 +64,7 @@ class StatusCheckCreate(BaseModel):
     client_name: str
 
 class User(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     name: str
     role: str = "user"  # "user" or "admin"
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -56,7 +78,7 @@ class UserLogin(BaseModel):
     name: str
 
 class BadgeGeneration(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     user_id: str
     user_name: str
     employee_name: str
@@ -68,7 +90,7 @@ class BadgeGeneration(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class AdminAction(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     admin_id: str
     admin_name: str
     action: str
@@ -89,7 +111,7 @@ class AuthResponse(BaseModel):
     session_token: str
 
 class EmployeeProfile(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     user_id: str
     full_name: str
     position: str
@@ -111,7 +133,7 @@ class EmployeeProfileCreate(BaseModel):
     profile_picture: Optional[str] = None
 
 class LearningGoal(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     user_id: str
     title: str
     description: str
@@ -126,7 +148,7 @@ class LearningGoalCreate(BaseModel):
     target_completion_date: datetime
 
 class Milestone(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     user_id: str
     goal_id: Optional[str] = None
     what_learned: str
@@ -146,7 +168,7 @@ class MilestoneCreate(BaseModel):
     project_certificate_link: Optional[str] = None
 
 class Resource(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     title: str
     url: str
     description: str
@@ -165,7 +187,7 @@ class ResourceCreate(BaseModel):
     tags: List[str]
 
 class Bookmark(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     user_id: str
     bookmarked_user_id: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -187,7 +209,7 @@ class AdminStats(BaseModel):
     skills_by_department: List[dict]
 
 class RecommendationItem(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     title: str
     description: str
     platform: str
@@ -214,32 +236,68 @@ class RecommendationsResponse(BaseModel):
     total_count: int
     personalization_factors: List[str]
 
+def model_projection(model) -> dict:
+    """Mongo projection returning only the fields a response model declares"""
+    return {"_id": 0, **{field: 1 for field in model.model_fields}}
+
+# Keyset pagination over _id (newest first) for the list endpoints. Paging is
+# opt-in: without ?limit= the full list comes back, as the dashboards expect
+MAX_PAGE_SIZE = 500
+
+def cursor_filter(cursor: Optional[str]) -> dict:
+    """Mongo filter selecting documents older than a next_cursor value"""
+    if not cursor:
+        return {}
+    try:
+        return {"_id": {"$lt": ObjectId(cursor)}}
+    except InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def fetch_page(collection, query: dict, projection: dict, limit: Optional[int], cursor: Optional[str]) -> Tuple[list, Optional[str]]:
+    """Return one page of documents and the cursor for the next page (None on the last, or when unpaged)"""
+    find = collection.find({**query, **cursor_filter(cursor)}, {**projection, "_id": 1}).sort("_id", -1)
+    if limit is not None:
+        find = find.limit(limit).batch_size(limit)
+    docs = await find.to_list(limit)
+    next_cursor = str(docs[-1]["_id"]) if limit is not None and len(docs) == limit else None
+    for doc in docs:
+        del doc["_id"]
+    return docs, next_cursor
+
+def etag_response(request: Request, payload: dict, cache_control: str = "private, max-age=60") -> Response:
+    """JSON response with a weak ETag, answering 304 when the client already has it"""
+    body = orjson.dumps(payload, default=lambda model: model.model_dump())
+    etag = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Cookie"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
 # Authentication endpoints
 @api_router.post("/auth/login", response_model=AuthResponse)
 async def login_user(user_data: UserLogin, response: Response):
     try:
-        # Check if user exists
-        existing_user = await db.users.find_one({"name": user_data.name})
+        # Generate session token (simple approach - in production use JWT)
+        session_token = secrets.token_urlsafe(32)
+        now = datetime.utcnow()
         
-        if existing_user:
-            # Update last active
-            await db.users.update_one(
-                {"id": existing_user["id"]},
-                {"$set": {"last_active": datetime.utcnow()}}
-            )
-            user = User(**existing_user)
-        else:
-            # Create new user
-            role = "admin" if user_data.name == "Arush T." else "user"
-            user = User(name=user_data.name, role=role)
-            await db.users.insert_one(user.dict())
+        # Fields for a first-time user; an existing user only gets last_active + token
+        role = "admin" if user_data.name == "Arush T." else "user"
+        new_user = User(name=user_data.name, role=role, created_at=now, last_active=now).dict()
+        del new_user["last_active"]
         
-        # Generate session token (simple approach - in production use JWT)
-        session_token = str(uuid.uuid4())
-        await db.users.update_one(
-            {"id": user.id},
-            {"$set": {"session_token": session_token}}
+        # Find-or-create the user and start the session in a single round-trip
+        user_doc = await db.users.find_one_and_update(
+            {"name": user_data.name},
+            {
+                "$set": {"last_active": now, "session_token": session_token},
+                "$setOnInsert": new_user
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
         )
+        user = User(**user_doc)
+        session_cache[session_token] = {field: user_doc[field] for field in ("id", "name", "role")}
         
         # Set cookie
         response.set_cookie(
@@ -258,7 +316,7 @@ async def login_user(user_data: UserLogin, response: Response):
                 action="login",
                 details="Admin logged into the system"
             )
-            await db.admin_actions.insert_one(admin_action.dict())
+            log_admin_action(admin_action)
         
         return AuthResponse(user=user, session_token=session_token)
         
@@ -270,6 +328,7 @@ async def login_user(user_data: UserLogin, response: Response):
 async def logout_user(response: Response, session_token: str = Cookie(None)):
     try:
         if session_token:
+            session_cache.pop(session_token, None)
             # Remove session token from user
             await db.users.update_one(
                 {"session_token": session_token},
@@ -306,13 +365,12 @@ async def create_employee_profile(profile_data: EmployeeProfileCreate, session_t
     try:
         user = await verify_user_session(session_token)
         
-        # Check if profile already exists
-        existing_profile = await db.employee_profiles.find_one({"user_id": user["id"]})
-        if existing_profile:
-            raise HTTPException(status_code=400, detail="Profile already exists")
-        
+        # The unique user_id index rejects a second profile for the same user
         profile = EmployeeProfile(user_id=user["id"], **profile_data.dict())
-        await db.employee_profiles.insert_one(profile.dict())
+        try:
+            await db.employee_profiles.insert_one(profile.dict())
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Profile already exists")
         
         return profile
     except HTTPException:
@@ -343,15 +401,15 @@ async def update_employee_profile(profile_data: EmployeeProfileCreate, session_t
         update_data = profile_data.dict()
         update_data["updated_at"] = datetime.utcnow()
         
-        result = await db.employee_profiles.update_one(
+        updated_profile = await db.employee_profiles.find_one_and_update(
             {"user_id": user["id"]},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
+        if not updated_profile:
             raise HTTPException(status_code=404, detail="Profile not found")
         
-        updated_profile = await db.employee_profiles.find_one({"user_id": user["id"]})
         return EmployeeProfile(**updated_profile)
     except HTTPException:
         raise
@@ -378,9 +436,8 @@ async def get_learning_goals(session_token: str = Cookie(None)):
     try:
         user = await verify_user_session(session_token)
         
-        goals = []
-        async for goal in db.learning_goals.find({"user_id": user["id"]}).sort("created_at", -1):
-            goals.append(LearningGoal(**goal))
+        docs = await db.learning_goals.find({"user_id": user["id"]}, model_projection(LearningGoal)).sort("created_at", -1).to_list(None)
+        goals = [LearningGoal.model_construct(**goal) for goal in docs]
         
         return {"goals": goals}
     except HTTPException:
@@ -427,6 +484,9 @@ async def create_milestone(milestone_data: MilestoneCreate, session_token: str =
         )
         await db.milestones.insert_one(milestone.dict())
         
+        # Keep the per-user monthly counters used by the admin stats in step
+        await bump_monthly_stats(milestone)
+        
         # Auto-add resource if it's a new source
         await auto_add_resource_from_milestone(milestone, user["id"])
         
@@ -441,9 +501,8 @@ async def get_milestones(session_token: str = Cookie(None)):
     try:
         user = await verify_user_session(session_token)
         
-        milestones = []
-        async for milestone in db.milestones.find({"user_id": user["id"]}).sort("created_at", -1):
-            milestones.append(Milestone(**milestone))
+        docs = await db.milestones.find({"user_id": user["id"]}, model_projection(Milestone)).sort("created_at", -1).to_list(None)
+        milestones = [Milestone.model_construct(**milestone) for milestone in docs]
         
         return {"milestones": milestones}
     except HTTPException:
@@ -453,7 +512,7 @@ async def get_milestones(session_token: str = Cookie(None)):
 
 # Resources endpoints
 @api_router.get("/resources")
-async def get_approved_resources(category: str = None, session_token: str = Cookie(None)):
+async def get_approved_resources(request: Request, category: str = None, session_token: str = Cookie(None)):
     try:
         await verify_user_session(session_token)
         
@@ -461,11 +520,10 @@ async def get_approved_resources(category: str = None, session_token: str = Cook
         if category:
             query["category"] = category
         
-        resources = []
-        async for resource in db.resources.find(query).sort("created_at", -1):
-            resources.append(Resource(**resource))
+        docs = await db.resources.find(query, model_projection(Resource)).sort("created_at", -1).to_list(None)
+        resources = [Resource.model_construct(**resource) for resource in docs]
         
-        return {"resources": resources}
+        return etag_response(request, {"resources": resources})
     except HTTPException:
         raise
     except Exception as e:
@@ -473,39 +531,58 @@ async def get_approved_resources(category: str = None, session_token: str = Cook
 
 # Peer Learning endpoints
 @api_router.get("/peers")
-async def get_peer_profiles(session_token: str = Cookie(None)):
+async def get_peer_profiles(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session_token: str = Cookie(None)
+):
     try:
         user = await verify_user_session(session_token)
         
-        # Get all profiles except current user
-        profiles = []
-        async for profile in db.employee_profiles.find({"user_id": {"$ne": user["id"]}}):
+        # Get all profiles except current user, with their 3 latest milestones joined
+        # server-side so the page costs one round-trip regardless of peer count
+        peers_pipeline = [
+            {"$match": {"user_id": {"$ne": user["id"]}, **cursor_filter(cursor)}},
+            {"$sort": {"_id": -1}},
+            *([{"$limit": limit}] if limit is not None else []),
+            {"$lookup": {
+                "from": "milestones",
+                "let": {"uid": "$user_id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$user_id", "$$uid"]}}},
+                    {"$sort": {"created_at": -1}},
+                    {"$limit": 3},
+                    {"$project": {
+                        "_id": 0,
+                        "what_learned": 1,
+                        "source": 1,
+                        "can_teach": 1,
+                        "hours_invested": 1,
+                        "created_at": 1
+                    }}
+                ],
+                "as": "recent_milestones"
+            }},
             # Remove sensitive data - only show learning-related info
-            peer_profile = {
-                "id": profile["id"],
-                "full_name": profile["full_name"],
-                "position": profile["position"],
-                "department": profile["department"],
-                "existing_skills": profile["existing_skills"],
-                "learning_interests": profile["learning_interests"],
-                "profile_picture": profile.get("profile_picture")
-            }
-            
-            # Add recent milestones
-            recent_milestones = []
-            async for milestone in db.milestones.find({"user_id": profile["user_id"]}).sort("created_at", -1).limit(3):
-                recent_milestones.append({
-                    "what_learned": milestone["what_learned"],
-                    "source": milestone["source"],
-                    "can_teach": milestone["can_teach"],
-                    "hours_invested": milestone["hours_invested"],
-                    "created_at": milestone["created_at"]
-                })
-            
-            peer_profile["recent_milestones"] = recent_milestones
-            profiles.append(peer_profile)
+            {"$project": {
+                "_id": 1,
+                "id": 1,
+                "full_name": 1,
+                "position": 1,
+                "department": 1,
+                "existing_skills": 1,
+                "learning_interests": 1,
+                "profile_picture": {"$ifNull": ["$profile_picture", None]},
+                "recent_milestones": 1
+            }}
+        ]
+        profiles = await _aggregate(db.employee_profiles, peers_pipeline)
+        next_cursor = str(profiles[-1]["_id"]) if limit is not None and len(profiles) == limit else None
+        for profile in profiles:
+            del profile["_id"]
         
-        return {"peers": profiles}
+        return etag_response(request, {"peers": profiles, "next_cursor": next_cursor})
     except HTTPException:
         raise
     except Exception as e:
@@ -516,13 +593,12 @@ async def bookmark_user(user_id: str, session_token: str = Cookie(None)):
     try:
         user = await verify_user_session(session_token)
         
-        # Check if bookmark already exists
-        existing = await db.bookmarks.find_one({"user_id": user["id"], "bookmarked_user_id": user_id})
-        if existing:
-            raise HTTPException(status_code=400, detail="Already bookmarked")
-        
+        # The unique (user_id, bookmarked_user_id) index rejects repeat bookmarks
         bookmark = Bookmark(user_id=user["id"], bookmarked_user_id=user_id)
-        await db.bookmarks.insert_one(bookmark.dict())
+        try:
+            await db.bookmarks.insert_one(bookmark.dict())
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Already bookmarked")
         
         return {"message": "User bookmarked successfully"}
     except HTTPException:
@@ -530,17 +606,50 @@ async def bookmark_user(user_id: str, session_token: str = Cookie(None)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Session token -> user document. Each worker has its own copy, so a token revoked
+# by a logout or replaced by a re-login on another worker keeps authenticating
+# ordinary user requests here for up to SESSION_CACHE_TTL seconds. Admin checks
+# never use the cached entry (see verify_admin), so revocation there is immediate.
+SESSION_CACHE_TTL = 10
+session_cache = TTLCache(maxsize=10_000, ttl=SESSION_CACHE_TTL)
+
+# Session checks only need who the user is and whether they are an admin
+SESSION_USER_PROJECTION = {"_id": 0, "id": 1, "name": 1, "role": 1}
+
+async def find_session_user(session_token: str, fresh: bool = False) -> Optional[dict]:
+    """Resolve a session token to its user, serving repeats from session_cache unless fresh"""
+    user = None if fresh else session_cache.get(session_token)
+    if user is None:
+        user = await db.users.find_one({"session_token": session_token}, SESSION_USER_PROJECTION)
+        if user:
+            session_cache[session_token] = user
+        else:
+            session_cache.pop(session_token, None)
+    return user
+
 # Helper function to verify user session
 async def verify_user_session(session_token: str = Cookie(None)):
     if not session_token:
         raise HTTPException(status_code=401, detail="Authentication required")
     
-    user = await db.users.find_one({"session_token": session_token})
+    user = await find_session_user(session_token)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid session")
     
     return user
 
+# Helper function to keep monthly_stats in step with a new milestone
+async def bump_monthly_stats(milestone: Milestone):
+    try:
+        await db.monthly_stats.update_one(
+            {"user_id": milestone.user_id, "month_year": milestone.month_year},
+            {"$inc": {"total_hours": milestone.hours_invested, "count": 1}},
+            upsert=True
+        )
+    except Exception as e:
+        # The milestone is already saved, so don't fail the request over its counter
+        logger.error(f"Failed to update monthly_stats for milestone {milestone.id}: {str(e)}")
+
 # Helper function to auto-add resources from milestones
 async def auto_add_resource_from_milestone(milestone: Milestone, user_id: str):
     try:
@@ -577,19 +686,13 @@ async def get_user_learning_profile(user_id: str):
         profile = await db.employee_profiles.find_one({"user_id": user_id})
         
         # Get learning goals
-        goals = []
-        async for goal in db.learning_goals.find({"user_id": user_id}):
-            goals.append(goal)
+        goals = await db.learning_goals.find({"user_id": user_id}).to_list(None)
             
         # Get milestones
-        milestones = []
-        async for milestone in db.milestones.find({"user_id": user_id}).sort("created_at", -1).limit(20):
-            milestones.append(milestone)
+        milestones = await db.milestones.find({"user_id": user_id}).sort("created_at", -1).limit(20).to_list(20)
             
         # Get badge generations for learning interests
-        badges = []
-        async for badge in db.badge_generations.find({"user_id": user_id}).sort("created_at", -1).limit(10):
-            badges.append(badge)
+        badges = await db.badge_generations.find({"user_id": user_id}).sort("created_at", -1).limit(10).to_list(10)
             
         return {
             "profile": profile,
@@ -601,36 +704,24 @@ async def get_user_learning_profile(user_id: str):
         logger.error(f"Error getting user learning profile: {str(e)}")
         return None
 
-async def generate_ai_recommendations(user_profile: dict):
-    """Use Gemini AI to generate personalized learning recommendations"""
-    try:
-        if not GEMINI_API_KEY:
-            return {"paid": [], "unpaid": []}
-            
-        # Prepare user data for AI analysis
-        profile = user_profile.get("profile", {})
-        goals = user_profile.get("goals", [])
-        milestones = user_profile.get("milestones", [])
-        badges = user_profile.get("badges", [])
-        
-        # Create comprehensive prompt for AI
-        prompt = f"""You are an expert AI learning advisor specializing in personalized course recommendations. 
+# Recommendations prompt, compiled once at import ($$ is a literal dollar sign)
+RECOMMENDATIONS_PROMPT = Template("""You are an expert AI learning advisor specializing in personalized course recommendations. 
 
 Based on the following employee learning data, generate 8-10 highly personalized learning recommendations (mix of paid and unpaid resources).
 
 EMPLOYEE PROFILE:
-- Department: {profile.get('department', 'Not specified')}
-- Position: {profile.get('position', 'Not specified')}
-- Existing Skills: {', '.join(profile.get('existing_skills', [])) if profile.get('existing_skills') else 'None specified'}
-- Learning Interests: {', '.join(profile.get('learning_interests', [])) if profile.get('learning_interests') else 'None specified'}
+- Department: $department
+- Position: $position
+- Existing Skills: $existing_skills
+- Learning Interests: $learning_interests
 
 RECENT LEARNING ACTIVITIES:
-Recent Milestones: {[m.get('what_learned', '') for m in milestones[:5]]}
-Learning Sources Used: {list(set([m.get('source', '') for m in milestones if m.get('source')]))}
-Badge Generations: {[b.get('learning', '') for b in badges[:3]]}
+Recent Milestones: $recent_milestones
+Learning Sources Used: $learning_sources
+Badge Generations: $badge_learnings
 
 LEARNING GOALS:
-Active Goals: {[g.get('title', '') for g in goals if g.get('status') == 'active']}
+Active Goals: $active_goals
 
 INSTRUCTIONS:
 1. Generate 5-6 FREE resources (YouTube channels, free courses, documentation, tutorials)
@@ -662,12 +753,41 @@ Description: [2-3 sentence description]
 Skills: [skill1, skill2, skill3]
 Difficulty: [beginner/intermediate/advanced]
 Hours: [number]
-Price: [Estimated price like $49, $29/month, etc.]
+Price: [Estimated price like $$49, $$29/month, etc.]
 Reason: [Why recommended for this person]
 ---
 [Repeat for each paid resource]
 
-Make recommendations feel personal and directly relevant to their learning journey."""
+Make recommendations feel personal and directly relevant to their learning journey.""")
+
+# "PAID_RESOURCES:" is also the tail of "UNPAID_RESOURCES:", hence the lookbehind
+AI_RECOMMENDATIONS_RE = re.compile(
+    r'UNPAID_RESOURCES:(?P<unpaid>.*?)(?<!UN)PAID_RESOURCES:(?P<paid>.*)', re.DOTALL
+)
+
+async def generate_ai_recommendations(user_profile: dict):
+    """Use Gemini AI to generate personalized learning recommendations"""
+    try:
+        if not GEMINI_API_KEY:
+            return {"paid": [], "unpaid": []}
+            
+        # Prepare user data for AI analysis
+        profile = user_profile.get("profile", {})
+        goals = user_profile.get("goals", [])
+        milestones = user_profile.get("milestones", [])
+        badges = user_profile.get("badges", [])
+        
+        # Fill the precompiled recommendations prompt
+        prompt = RECOMMENDATIONS_PROMPT.substitute(
+            department=profile.get('department', 'Not specified'),
+            position=profile.get('position', 'Not specified'),
+            existing_skills=', '.join(profile.get('existing_skills', [])) if profile.get('existing_skills') else 'None specified',
+            learning_interests=', '.join(profile.get('learning_interests', [])) if profile.get('learning_interests') else 'None specified',
+            recent_milestones=[m.get('what_learned', '') for m in milestones[:5]],
+            learning_sources=list(set([m.get('source', '') for m in milestones if m.get('source')])),
+            badge_learnings=[b.get('learning', '') for b in badges[:3]],
+            active_goals=[g.get('title', '') for g in goals if g.get('status') == 'active']
+        )
 
         # Make request to Gemini API
         payload = {
@@ -686,17 +806,18 @@ Make recommendations feel personal and directly relevant to their learning journ
             "Content-Type": "application/json"
         }
         
-        response = requests.post(
-            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
+        response = await app.state.http.post(
+            GEMINI_API_URL,
+            params={"key": GEMINI_API_KEY},
             headers=headers,
-            json=payload
+            content=orjson.dumps(payload)
         )
         
         if response.status_code != 200:
             logger.error(f"Gemini API error: {response.text}")
             return {"paid": [], "unpaid": []}
             
-        response_data = response.json()
+        response_data = orjson.loads(response.content)
         
         if not response_data.get('candidates') or not response_data['candidates'][0].get('content'):
             logger.error("Invalid response from Gemini API")
@@ -718,10 +839,10 @@ def parse_ai_recommendations(ai_response: str):
         unpaid_recommendations = []
         
         # Split by sections
-        if "UNPAID_RESOURCES:" in ai_response and "PAID_RESOURCES:" in ai_response:
-            parts = ai_response.split("PAID_RESOURCES:")
-            unpaid_section = parts[0].replace("UNPAID_RESOURCES:", "").strip()
-            paid_section = parts[1].strip()
+        sections = AI_RECOMMENDATIONS_RE.search(ai_response)
+        if sections:
+            unpaid_section = sections.group('unpaid').strip()
+            paid_section = sections.group('paid').strip()
         else:
             return {"paid": [], "unpaid": []}
         
@@ -892,97 +1013,184 @@ async def refresh_recommendations(session_token: str = Cookie(None)):
         logger.error(f"Error refreshing recommendations: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Admin dashboards poll; make browsers revalidate every time so unchanged data is a 304
+ADMIN_CACHE_CONTROL = "private, no-cache"
+
+# Admin audit records are queued and written in batches off the request path
+audit_queue: Optional[asyncio.Queue] = None
+AUDIT_BATCH_SIZE = 100
+AUDIT_FLUSH_INTERVAL = 0.5  # seconds
+
+def log_admin_action(admin_action: AdminAction):
+    """Queue an audit record for audit_log_writer to persist"""
+    audit_queue.put_nowait(admin_action.dict())
+
+async def audit_log_writer():
+    """Drain audit_queue into admin_actions with insert_many until a None sentinel"""
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        record = await audit_queue.get()
+        if record is None:
+            break
+        batch = [record]
+        deadline = loop.time() + AUDIT_FLUSH_INTERVAL
+        while len(batch) < AUDIT_BATCH_SIZE:
+            try:
+                record = await asyncio.wait_for(audit_queue.get(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                break
+            if record is None:
+                stopping = True
+                break
+            batch.append(record)
+        try:
+            await db.admin_actions.with_options(write_concern=LOW_PRIORITY_WRITE).insert_many(batch, ordered=False)
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} admin actions: {str(e)}")
+
 # Enhanced admin endpoints
 async def verify_admin(session_token: str = Cookie(None)):
     if not session_token:
         raise HTTPException(status_code=401, detail="Authentication required")
     
-    user = await db.users.find_one({"session_token": session_token})
+    # Always checked against the database: a revoked admin token must stop working at once
+    user = await find_session_user(session_token, fresh=True)
     if not user or user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
     return user
 
 # Admin endpoints
+# Assembled AdminStats, recomputed at most every 30 seconds per worker
+admin_stats_cache = TTLCache(maxsize=1, ttl=30)
+
+async def _aggregate(collection, pipeline: list, length: Optional[int] = None) -> list:
+    """Run an aggregation pipeline and collect the results"""
+    return await (await collection.aggregate(pipeline)).to_list(length)
+
+RECENT_ACTIVITY_PROJECTION = {
+    "_id": 0, "user_name": 1, "employee_name": 1, "learning": 1, "difficulty": 1, "created_at": 1
+}
+
+async def _compute_admin_stats() -> AdminStats:
+    """Run the dashboard queries and assemble AdminStats"""
+    current_month = datetime.utcnow().strftime("%Y-%m")
+    
+    # Get top learners (badge count)
+    pipeline = [
+        {"$group": {"_id": "$user_name", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": 10}
+    ]
+    
+    # Calculate monthly learning hours for current month from the per-user counters
+    monthly_hours_pipeline = [
+        {"$match": {"month_year": current_month}},
+        {"$group": {"_id": None, "total_hours": {"$sum": "$total_hours"}}}
+    ]
+    
+    # Get top learning platforms
+    platforms_pipeline = [
+        {"$group": {"_id": "$source", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": 10}
+    ]
+    
+    # Get skills by department (first 20 department/skill pairs)
+    skills_pipeline = [
+        {"$project": {"_id": 0, "department": 1, "existing_skills": 1}},
+        {"$unwind": "$existing_skills"},
+        {"$project": {"department": 1, "skill": "$existing_skills"}},
+        {"$limit": 20}
+    ]
+    
+    # The queries are independent, so run them concurrently over the pool
+    (
+        total_users,
+        total_admins,
+        total_badges,
+        total_profiles,
+        total_goals,
+        total_milestones,
+        total_resources,
+        recent_badges,
+        learners,
+        monthly_hours_result,
+        employees_meeting_target,
+        platforms,
+        skills_by_dept
+    ) = await asyncio.gather(
+        db.users.count_documents({}),
+        db.users.count_documents({"role": "admin"}),
+        db.badge_generations.count_documents({}),
+        db.employee_profiles.count_documents({}),
+        db.learning_goals.count_documents({}),
+        db.milestones.count_documents({}),
+        db.resources.count_documents({}),
+        db.badge_generations.find({}, RECENT_ACTIVITY_PROJECTION).sort("created_at", -1).limit(20).to_list(20),
+        _aggregate(db.badge_generations, pipeline, 10),
+        _aggregate(db.monthly_stats, monthly_hours_pipeline, 1),
+        # Count employees meeting 6-hour target this month
+        db.monthly_stats.count_documents({"month_year": current_month, "total_hours": {"$gte": 6}}),
+        _aggregate(db.milestones, platforms_pipeline, 10),
+        _aggregate(db.employee_profiles, skills_pipeline, 20)
+    )
+    
+    # Get recent activities (last 20 badge generations)
+    recent_activities = []
+    for activity in recent_badges:
+        recent_activities.append({
+            "user_name": activity["user_name"],
+            "employee_name": activity["employee_name"],
+            "learning": activity["learning"],
+            "difficulty": activity["difficulty"],
+            "created_at": activity["created_at"]
+        })
+    
+    top_learners = []
+    for learner in learners:
+        top_learners.append({
+            "name": learner["_id"],
+            "badge_count": learner["count"]
+        })
+    
+    monthly_learning_hours = monthly_hours_result[0]["total_hours"] if monthly_hours_result else 0
+    
+    top_platforms = []
+    for platform in platforms:
+        top_platforms.append({
+            "platform": platform["_id"],
+            "usage_count": platform["count"]
+        })
+    
+    return AdminStats(
+        # Badge stats
+        total_users=total_users,
+        total_admins=total_admins,
+        total_badges_generated=total_badges,
+        recent_activities=recent_activities,
+        top_learners=top_learners,
+        # Learning platform stats
+        total_profiles=total_profiles,
+        total_goals=total_goals,
+        total_milestones=total_milestones,
+        total_resources=total_resources,
+        monthly_learning_hours=monthly_learning_hours,
+        employees_meeting_target=employees_meeting_target,
+        top_learning_platforms=top_platforms,
+        skills_by_department=skills_by_dept
+    )
+
 @api_router.get("/admin/stats", response_model=AdminStats)
 async def get_admin_stats(session_token: str = Cookie(None)):
     try:
         admin_user = await verify_admin(session_token)
         
-        # Get existing badge stats
-        total_users = await db.users.count_documents({})
-        total_admins = await db.users.count_documents({"role": "admin"})
-        total_badges = await db.badge_generations.count_documents({})
-        
-        # Get recent activities (last 20 badge generations)
-        recent_activities = []
-        async for activity in db.badge_generations.find({}).sort("created_at", -1).limit(20):
-            recent_activities.append({
-                "user_name": activity["user_name"],
-                "employee_name": activity["employee_name"],
-                "learning": activity["learning"],
-                "difficulty": activity["difficulty"],
-                "created_at": activity["created_at"]
-            })
-        
-        # Get top learners (badge count)
-        pipeline = [
-            {"$group": {"_id": "$user_name", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": 10}
-        ]
-        top_learners = []
-        async for learner in db.badge_generations.aggregate(pipeline):
-            top_learners.append({
-                "name": learner["_id"],
-                "badge_count": learner["count"]
-            })
-        
-        # Get learning platform stats
-        total_profiles = await db.employee_profiles.count_documents({})
-        total_goals = await db.learning_goals.count_documents({})
-        total_milestones = await db.milestones.count_documents({})
-        total_resources = await db.resources.count_documents({})
-        
-        # Calculate monthly learning hours for current month
-        current_month = datetime.utcnow().strftime("%Y-%m")
-        monthly_hours_pipeline = [
-            {"$match": {"month_year": current_month}},
-            {"$group": {"_id": None, "total_hours": {"$sum": "$hours_invested"}}}
-        ]
-        monthly_hours_result = await db.milestones.aggregate(monthly_hours_pipeline).to_list(1)
-        monthly_learning_hours = monthly_hours_result[0]["total_hours"] if monthly_hours_result else 0
-        
-        # Count employees meeting 6-hour target this month
-        employees_meeting_target_pipeline = [
-            {"$match": {"month_year": current_month}},
-            {"$group": {"_id": "$user_id", "total_hours": {"$sum": "$hours_invested"}}},
-            {"$match": {"total_hours": {"$gte": 6}}}
-        ]
-        meeting_target_result = await db.milestones.aggregate(employees_meeting_target_pipeline).to_list(1000)
-        employees_meeting_target = len(meeting_target_result)
-        
-        # Get top learning platforms
-        platforms_pipeline = [
-            {"$group": {"_id": "$source", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": 10}
-        ]
-        top_platforms = []
-        async for platform in db.milestones.aggregate(platforms_pipeline):
-            top_platforms.append({
-                "platform": platform["_id"],
-                "usage_count": platform["count"]
-            })
-        
-        # Get skills by department
-        skills_by_dept = []
-        async for profile in db.employee_profiles.find({}):
-            for skill in profile.get("existing_skills", []):
-                skills_by_dept.append({
-                    "department": profile["department"],
-                    "skill": skill
-                })
+        stats = admin_stats_cache.get("stats")
+        if stats is None:
+            stats = await _compute_admin_stats()
+            admin_stats_cache["stats"] = stats
         
         # Log admin action
         admin_action = AdminAction(
@@ -991,25 +1199,9 @@ async def get_admin_stats(session_token: str = Cookie(None)):
             action="view_enhanced_stats",
             details="Viewed enhanced admin dashboard with learning platform analytics"
         )
-        await db.admin_actions.insert_one(admin_action.dict())
-        
-        return AdminStats(
-            # Badge stats
-            total_users=total_users,
-            total_admins=total_admins,
-            total_badges_generated=total_badges,
-            recent_activities=recent_activities,
-            top_learners=top_learners,
-            # Learning platform stats
-            total_profiles=total_profiles,
-            total_goals=total_goals,
-            total_milestones=total_milestones,
-            total_resources=total_resources,
-            monthly_learning_hours=monthly_learning_hours,
-            employees_meeting_target=employees_meeting_target,
-            top_learning_platforms=top_platforms,
-            skills_by_department=skills_by_dept[:20]  # Limit for performance
-        )
+        log_admin_action(admin_action)
+        
+        return stats
         
     except HTTPException:
         raise
@@ -1018,13 +1210,16 @@ async def get_admin_stats(session_token: str = Cookie(None)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/admin/resources/pending")
-async def get_pending_resources(session_token: str = Cookie(None)):
+async def get_pending_resources(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session_token: str = Cookie(None)
+):
     try:
         admin_user = await verify_admin(session_token)
         
-        resources = []
-        async for resource in db.resources.find({"approved": False}).sort("created_at", -1):
-            resources.append(Resource(**resource))
+        docs, next_cursor = await fetch_page(db.resources, {"approved": False}, model_projection(Resource), limit, cursor)
+        resources = [Resource.model_construct(**resource) for resource in docs]
         
         # Log admin action
         admin_action = AdminAction(
@@ -1033,9 +1228,9 @@ async def get_pending_resources(session_token: str = Cookie(None)):
             action="view_pending_resources",
             details="Viewed pending resources for approval"
         )
-        await db.admin_actions.insert_one(admin_action.dict())
+        log_admin_action(admin_action)
         
-        return {"resources": resources}
+        return {"resources": resources, "next_cursor": next_cursor}
     except HTTPException:
         raise
     except Exception as e:
@@ -1066,7 +1261,7 @@ async def approve_resource(resource_id: str, session_token: str = Cookie(None)):
             action="approve_resource",
             details=f"Approved resource with ID: {resource_id}"
         )
-        await db.admin_actions.insert_one(admin_action.dict())
+        log_admin_action(admin_action)
         
         return {"message": "Resource approved successfully"}
     except HTTPException:
@@ -1096,14 +1291,6 @@ async def get_learning_analytics(session_token: str = Cookie(None)):
             {"$sort": {"total_hours": -1}}
         ]
         
-        dept_analytics = []
-        async for result in db.milestones.aggregate(dept_hours_pipeline):
-            dept_analytics.append({
-                "department": result["_id"],
-                "total_hours": result["total_hours"],
-                "milestone_count": result["milestone_count"]
-            })
-        
         # Skills trend analysis
         skills_pipeline = [
             {"$lookup": {
@@ -1132,8 +1319,21 @@ async def get_learning_analytics(session_token: str = Cookie(None)):
             {"$limit": 20}
         ]
         
+        dept_results, skills_results = await asyncio.gather(
+            _aggregate(db.milestones, dept_hours_pipeline),
+            _aggregate(db.milestones, skills_pipeline)
+        )
+        
+        dept_analytics = []
+        for result in dept_results:
+            dept_analytics.append({
+                "department": result["_id"],
+                "total_hours": result["total_hours"],
+                "milestone_count": result["milestone_count"]
+            })
+        
         skills_trends = []
-        async for result in db.milestones.aggregate(skills_pipeline):
+        for result in skills_results:
             skills_trends.append({
                 "skill": result["_id"],
                 "total_count": result["total"],
@@ -1147,7 +1347,7 @@ async def get_learning_analytics(session_token: str = Cookie(None)):
             action="view_learning_analytics",
             details="Viewed detailed learning analytics dashboard"
         )
-        await db.admin_actions.insert_one(admin_action.dict())
+        log_admin_action(admin_action)
         
         return {
             "department_analytics": dept_analytics,
@@ -1159,13 +1359,16 @@ async def get_learning_analytics(session_token: str = Cookie(None)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/admin/users")
-async def get_all_users(session_token: str = Cookie(None)):
+async def get_all_users(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session_token: str = Cookie(None)
+):
     try:
         admin_user = await verify_admin(session_token)
         
-        users = []
-        async for user in db.users.find({}):
-            users.append(User(**user))
+        docs, next_cursor = await fetch_page(db.users, {}, model_projection(User), limit, cursor)
+        users = [User.model_construct(**user) for user in docs]
         
         # Log admin action
         admin_action = AdminAction(
@@ -1174,9 +1377,9 @@ async def get_all_users(session_token: str = Cookie(None)):
             action="view_users",
             details="Viewed all users list"
         )
-        await db.admin_actions.insert_one(admin_action.dict())
+        log_admin_action(admin_action)
         
-        return {"users": users}
+        return {"users": users, "next_cursor": next_cursor}
         
     except HTTPException:
         raise
@@ -1185,13 +1388,17 @@ async def get_all_users(session_token: str = Cookie(None)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/admin/badges")
-async def get_all_badge_generations(session_token: str = Cookie(None)):
+async def get_all_badge_generations(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session_token: str = Cookie(None)
+):
     try:
         admin_user = await verify_admin(session_token)
         
-        badges = []
-        async for badge in db.badge_generations.find({}).sort("created_at", -1):
-            badges.append(BadgeGeneration(**badge))
+        # Projected documents are already in response shape
+        badges, next_cursor = await fetch_page(db.badge_generations, {}, model_projection(BadgeGeneration), limit, cursor)
         
         # Log admin action
         admin_action = AdminAction(
@@ -1200,9 +1407,9 @@ async def get_all_badge_generations(session_token: str = Cookie(None)):
             action="view_badges",
             details="Viewed all badge generations"
         )
-        await db.admin_actions.insert_one(admin_action.dict())
+        log_admin_action(admin_action)
         
-        return {"badges": badges}
+        return etag_response(request, {"badges": badges, "next_cursor": next_cursor}, ADMIN_CACHE_CONTROL)
         
     except HTTPException:
         raise
@@ -1211,15 +1418,19 @@ async def get_all_badge_generations(session_token: str = Cookie(None)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/admin/actions")
-async def get_admin_actions(session_token: str = Cookie(None)):
+async def get_admin_actions(
+    request: Request,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session_token: str = Cookie(None)
+):
     try:
         admin_user = await verify_admin(session_token)
         
-        actions = []
-        async for action in db.admin_actions.find({}).sort("timestamp", -1).limit(100):
-            actions.append(AdminAction(**action))
+        # Projected documents are already in response shape
+        actions, next_cursor = await fetch_page(db.admin_actions, {}, model_projection(AdminAction), limit, cursor)
         
-        return {"actions": actions}
+        return etag_response(request, {"actions": actions, "next_cursor": next_cursor}, ADMIN_CACHE_CONTROL)
         
     except HTTPException:
         raise
@@ -1227,47 +1438,8 @@ async def get_admin_actions(session_token: str = Cookie(None)):
         logger.error(f"Error getting admin actions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-# Badge generation function
-def generate_badge_svg(employee_name: str, badge_text: str, difficulty: str) -> str:
-    """Generate SVG badge with Branding Pioneers branding - different designs for each difficulty"""
-    
-    # Define color schemes for each difficulty
-    difficulty_colors = {
-        "Easy": {
-            "primary": "#00FF88",
-            "secondary": "#00CC66", 
-            "accent": "#1C1C1C",
-            "glow": "#00FFAA",
-            "wing": "#90EE90"
-        },
-        "Moderate": {
-            "primary": "#FFAA00",
-            "secondary": "#FF8800",
-            "accent": "#222222", 
-            "glow": "#FFDD55",
-            "wing": "#FFD700"
-        },
-        "Hard": {
-            "primary": "#FF3366",
-            "secondary": "#FF1144",
-            "accent": "#2A2A2A",
-            "glow": "#FF6688", 
-            "wing": "#FF69B4"
-        }
-    }
-    
-    colors = difficulty_colors.get(difficulty, difficulty_colors["Easy"])
-    
-    # Difficulty symbols
-    difficulty_symbols = {
-        "Easy": "★",
-        "Moderate": "★★", 
-        "Hard": "★★★"
-    }
-    
-    symbol = difficulty_symbols.get(difficulty, "★")
-    
-    svg_content = f"""
+# Badge SVG source; str.format placeholders are filled per difficulty at import time
+BADGE_SVG_SOURCE = """
     <svg width="400" height="400" viewBox="0 0 400 400" xmlns="http://www.w3.org/2000/svg">
         <defs>
             <!-- Dark atmospheric background gradient -->
@@ -1279,20 +1451,20 @@ def generate_badge_svg(employee_name: str, badge_text: str, difficulty: str) ->
             
             <!-- Hexagon gradient for difficulty -->
             <linearGradient id="hexGradient" x1="0%" y1="0%" x2="100%" y2="100%">
-                <stop offset="0%" style="stop-color:{colors['primary']};stop-opacity:1" />
-                <stop offset="100%" style="stop-color:{colors['secondary']};stop-opacity:1" />
+                <stop offset="0%" style="stop-color:{primary};stop-opacity:1" />
+                <stop offset="100%" style="stop-color:{secondary};stop-opacity:1" />
             </linearGradient>
             
             <!-- Metallic wing gradient -->
             <linearGradient id="wingGradient" x1="0%" y1="0%" x2="100%" y2="100%">
-                <stop offset="0%" style="stop-color:{colors['wing']};stop-opacity:0.8" />
+                <stop offset="0%" style="stop-color:{wing};stop-opacity:0.8" />
                 <stop offset="50%" style="stop-color:#c0c0c0;stop-opacity:0.6" />
                 <stop offset="100%" style="stop-color:#a0a0a0;stop-opacity:0.4" />
             </linearGradient>
             
             <!-- Inner hexagon gradient -->
             <linearGradient id="innerHexGradient" x1="0%" y1="0%" x2="100%" y2="100%">
-                <stop offset="0%" style="stop-color:{colors['accent']};stop-opacity:1" />
+                <stop offset="0%" style="stop-color:{accent};stop-opacity:1" />
                 <stop offset="100%" style="stop-color:#1a1a1a;stop-opacity:1" />
             </linearGradient>
             
@@ -1313,7 +1485,7 @@ def generate_badge_svg(employee_name: str, badge_text: str, difficulty: str) ->
             <!-- Difficulty glow -->
             <filter id="difficultyGlow" x="-50%" y="-50%" width="200%" height="200%">
                 <feGaussianBlur stdDeviation="2" result="coloredBlur"/>
-                <feFlood flood-color="{colors['glow']}" result="glowColor"/>
+                <feFlood flood-color="{glow}" result="glowColor"/>
                 <feComposite in="glowColor" in2="coloredBlur" operator="in" result="softGlow"/>
                 <feMerge> 
                     <feMergeNode in="softGlow"/>
@@ -1369,30 +1541,129 @@ def generate_badge_svg(employee_name: str, badge_text: str, difficulty: str) ->
         <!-- Difficulty indicator at bottom -->
         <rect x="160" y="340" width="80" height="20" rx="10" fill="url(#hexGradient)" opacity="0.8"/>
         <text x="200" y="354" font-family="Inter, sans-serif" font-size="12" font-weight="bold" fill="white" text-anchor="middle">
-            {difficulty.upper()}
+            {difficulty_upper}
         </text>
         
     </svg>
     """
-    return svg_content
 
-@api_router.post("/generate", response_model=GenerateResponse)
-async def generate_badge_and_post(request: GenerateRequest, session_token: str = Cookie(None)):
+# Color schemes for each difficulty
+DIFFICULTY_COLORS = MappingProxyType({
+    "Easy": MappingProxyType({
+        "primary": "#00FF88",
+        "secondary": "#00CC66",
+        "accent": "#1C1C1C",
+        "glow": "#00FFAA",
+        "wing": "#90EE90"
+    }),
+    "Moderate": MappingProxyType({
+        "primary": "#FFAA00",
+        "secondary": "#FF8800",
+        "accent": "#222222",
+        "glow": "#FFDD55",
+        "wing": "#FFD700"
+    }),
+    "Hard": MappingProxyType({
+        "primary": "#FF3366",
+        "secondary": "#FF1144",
+        "accent": "#2A2A2A",
+        "glow": "#FF6688",
+        "wing": "#FF69B4"
+    })
+})
+
+# Difficulty symbols
+DIFFICULTY_SYMBOLS = MappingProxyType({
+    "Easy": "★",
+    "Moderate": "★★",
+    "Hard": "★★★"
+})
+
+# One str.translate pass escapes user text for XML
+XML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+def xml_escape(text: str) -> str:
+    return text.translate(XML_ESCAPE_TABLE)
+
+def build_badge_svg(employee_name: str, difficulty: str) -> str:
+    """Render the badge SVG source for a difficulty (Easy colors for unknown difficulties)"""
+    colors = DIFFICULTY_COLORS.get(difficulty, DIFFICULTY_COLORS["Easy"])
+    symbol = DIFFICULTY_SYMBOLS.get(difficulty, "★")
+    
+    return BADGE_SVG_SOURCE.format(
+        employee_name=employee_name,
+        difficulty=xml_escape(difficulty),
+        difficulty_upper=xml_escape(difficulty.upper()),
+        symbol=symbol,
+        **colors
+    )
+
+# Per-difficulty templates with only the employee name left to interpolate
+SVG_TEMPLATES = {
+    difficulty: build_badge_svg("{employee_name}", difficulty)
+    for difficulty in DIFFICULTY_COLORS
+}
+
+# Badge generation function
+def generate_badge_svg(employee_name: str, badge_text: str, difficulty: str) -> str:
+    """Generate SVG badge with Branding Pioneers branding - different designs for each difficulty"""
+    template = SVG_TEMPLATES.get(difficulty)
+    if template is None:
+        return build_badge_svg(xml_escape(employee_name), difficulty)
+    
+    return template.format(employee_name=xml_escape(employee_name))
+
+# Badges are content-addressed, so browsers and CDNs may cache them forever
+BADGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Rendered badge SVGs keyed by badge digest
+badge_svg_cache = LRUCache(maxsize=2048)
+
+def badge_digest(employee_name: str, badge_text: str, difficulty: str) -> str:
+    """Stable content hash identifying a rendered badge"""
+    key = "\x1f".join((employee_name, badge_text, difficulty))
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def badge_path(digest: str) -> str:
+    return f"/api/badge/{digest}.svg"
+
+@api_router.get("/badge/{digest}.svg", include_in_schema=False)
+async def get_badge_svg(digest: str, request: Request):
     try:
-        if not GEMINI_API_KEY:
-            raise HTTPException(status_code=500, detail="Gemini API key not configured")
-        
-        # Verify user session
-        if not session_token:
-            raise HTTPException(status_code=401, detail="Authentication required")
+        # The digest names the content, so it doubles as a strong ETag
+        headers = {"Cache-Control": BADGE_CACHE_CONTROL, "ETag": f'"{digest}"'}
+        if headers["ETag"] in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        
+        badge_svg = badge_svg_cache.get(digest)
+        if badge_svg is None:
+            # Rendered by another worker or before a restart - rebuild from the stored generation
+            badge = await db.badge_generations.find_one(
+                {"badge_url": badge_path(digest)},
+                {"_id": 0, "employee_name": 1, "badge_text": 1, "difficulty": 1}
+            )
+            if not badge:
+                raise HTTPException(status_code=404, detail="Badge not found")
+            
+            badge_svg = generate_badge_svg(badge["employee_name"], badge["badge_text"], badge["difficulty"])
+            badge_svg_cache[digest] = badge_svg
         
-        # Find user by session token (simple approach - in production use JWT)
-        user = await db.users.find_one({"session_token": session_token})
-        if not user:
-            raise HTTPException(status_code=401, detail="Invalid session")
+        return Response(
+            content=badge_svg,
+            media_type="image/svg+xml",
+            headers=headers
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error serving badge {digest}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Prepare the prompt for Gemini API
-        prompt = f"""You are an expert AI copywriter and branding strategist. You will receive three inputs: {request.employeeName}, {request.learning}, and {request.difficulty}.
+# Extracts both sections of the generation prompt's "BADGE: ... LINKEDIN_POST: ..." output
+GEMINI_RESPONSE_RE = re.compile(r'BADGE:\s*(?P<badge>.*?)\s*LINKEDIN_POST:\s*(?P<post>.*)', re.DOTALL)
+
+# Badge + LinkedIn post prompt, compiled once at import
+GEMINI_PROMPT = Template("""You are an expert AI copywriter and branding strategist. You will receive three inputs: $employee_name, $learning, and $difficulty.
 
 ### Task:
 Generate TWO outputs clearly separated:
@@ -1401,25 +1672,25 @@ Generate TWO outputs clearly separated:
 
 2. **LinkedIn Post**: A fully optimized LinkedIn post (200-300 words) that follows this EXACT format and structure:
 
-🎉 Super proud to share that I've just achieved a {request.difficulty} learning milestone in [Learning Topic] by Branding Pioneers! 🔥
+🎉 Super proud to share that I've just achieved a $difficulty learning milestone in [Learning Topic] by Branding Pioneers! 🔥
 
-This isn't just learning, it's a transformative journey that's preparing professionals like me to master {request.learning} and apply it in real-world scenarios.
+This isn't just learning, it's a transformative journey that's preparing professionals like me to master $learning and apply it in real-world scenarios.
 
 I've made a commitment to:
 Learn in Public and document everything I'm discovering not just for myself, but to inspire others to start their learning journey too. 🌱
 
-Here are my key takeaways from this {request.difficulty.lower()} level challenge:
+Here are my key takeaways from this $difficulty_lower level challenge:
 🧠 [Key insight 1 related to what they learned]
 🔍 [Key insight 2 related to what they learned]  
 ⚙️ [Key insight 3 related to what they learned]
 
-The learnings from this level have completely transformed my understanding of {request.learning} in real-world applications.
+The learnings from this level have completely transformed my understanding of $learning in real-world applications.
 
 ➡️ I'll be sharing updates of my journey and what I achieve in future levels
 
 🧭 Follow my journey and feel free to DM if you are curious, let's grow together.
 
-💬 What's one thing you're curious about when it comes to {request.learning}? Let's chat in the comments.
+💬 What's one thing you're curious about when it comes to $learning? Let's chat in the comments.
 
 #LearningInPublic #BrandingPioneers #GrowthMindset #ProfessionalDevelopment
 
@@ -1436,105 +1707,319 @@ BADGE: <badge text here>
 LINKEDIN_POST: <linkedin post text here>
 
 ### Inputs:
-Employee Name: {request.employeeName}
-Learning: {request.learning}
-Difficulty: {request.difficulty}"""
+Employee Name: $employee_name
+Learning: $learning
+Difficulty: $difficulty""")
+
+# Gemini responses keyed on normalized (employeeName, learning, difficulty)
+gemini_cache = TTLCache(maxsize=1024, ttl=3600)
+
+# Gemini calls currently in flight, so identical concurrent requests share one call
+gemini_inflight: Dict[Tuple[str, str, str], asyncio.Task] = {}
+
+def gemini_cache_key(employee_name: str, learning: str, difficulty: str) -> Tuple[str, str, str]:
+    """Key shared by gemini_cache and gemini_inflight for the streaming and non-streaming paths"""
+    return (employee_name.strip().lower(), learning.strip().lower(), difficulty)
+
+async def gemini_generate(employee_name: str, learning: str, difficulty: str) -> Tuple[str, str]:
+    """Return (badge_text, linkedin_post) from Gemini, serving repeats from cache"""
+    cache_key = gemini_cache_key(employee_name, learning, difficulty)
+    cached = gemini_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    task = gemini_inflight.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(gemini_request(employee_name, learning, difficulty))
+        gemini_inflight[cache_key] = task
+        
+        def settle(done: asyncio.Task):
+            # Runs when the call finishes, whichever clients are still waiting on it
+            gemini_inflight.pop(cache_key, None)
+            if not done.cancelled() and done.exception() is None:
+                gemini_cache[cache_key] = done.result()
+        
+        task.add_done_callback(settle)
+    
+    # Shield so no disconnecting client, the first one included, cancels the shared call
+    return await asyncio.shield(task)
 
-        # Prepare request payload for Gemini API
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {
-                            "text": prompt
-                        }
-                    ]
-                }
-            ]
-        }
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        # Make request to Gemini API
-        response = requests.post(
-            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
+async def acquire_gemini_slot():
+    """Take one Gemini concurrency slot, failing fast with 429 if none frees up"""
+    try:
+        await asyncio.wait_for(app.state.gemini_semaphore.acquire(), timeout=0.5)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=429,
+            detail="Badge generation is busy, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+@contextlib.asynccontextmanager
+async def gemini_slot():
+    """Hold one Gemini concurrency slot for the duration of the block"""
+    await acquire_gemini_slot()
+    try:
+        yield
+    finally:
+        app.state.gemini_semaphore.release()
+
+def gemini_badge_payload(employee_name: str, learning: str, difficulty: str) -> bytes:
+    """Serialized Gemini request body for the badge + LinkedIn post prompt"""
+    # Prepare the prompt for Gemini API
+    prompt = GEMINI_PROMPT.substitute(
+        employee_name=employee_name,
+        learning=learning,
+        difficulty=difficulty,
+        difficulty_lower=difficulty.lower()
+    )
+
+    # Prepare request payload for Gemini API
+    payload = {
+        "contents": [
+            {
+                "parts": [
+                    {
+                        "text": prompt
+                    }
+                ]
+            }
+        ]
+    }
+    return orjson.dumps(payload)
+
+def parse_gemini_text(generated_text: str) -> Tuple[str, str]:
+    """Split Gemini output into (badge_text, linkedin_post)"""
+    match = GEMINI_RESPONSE_RE.search(generated_text)
+    if not match:
+        raise HTTPException(status_code=500, detail="Could not parse Gemini response")
+    return match.group('badge').strip(), match.group('post').strip()
+
+async def gemini_request(employee_name: str, learning: str, difficulty: str) -> Tuple[str, str]:
+    """Call Gemini once and parse (badge_text, linkedin_post) from its reply"""
+    headers = {
+        "Content-Type": "application/json"
+    }
+    
+    # Make request to Gemini API
+    async with gemini_slot():
+        response = await app.state.http.post(
+            GEMINI_API_URL,
+            params={"key": GEMINI_API_KEY},
             headers=headers,
-            json=payload
+            content=gemini_badge_payload(employee_name, learning, difficulty)
         )
-        
-        if response.status_code != 200:
-            raise HTTPException(status_code=500, detail=f"Gemini API error: {response.text}")
-        
-        response_data = response.json()
-        
-        # Extract the generated text
-        if not response_data.get('candidates') or not response_data['candidates'][0].get('content'):
-            raise HTTPException(status_code=500, detail="Invalid response from Gemini API")
-        
-        generated_text = response_data['candidates'][0]['content']['parts'][0]['text']
-        
-        # Parse the response to extract badge text and LinkedIn post
-        lines = generated_text.strip().split('\n')
-        badge_text = ""
-        linkedin_post = ""
-        
-        for line in lines:
-            if line.startswith('BADGE:'):
-                badge_text = line.replace('BADGE:', '').strip()
-            elif line.startswith('LINKEDIN_POST:'):
-                linkedin_post = line.replace('LINKEDIN_POST:', '').strip()
-        
-        if not badge_text or not linkedin_post:
-            # Fallback parsing - try to find the content differently
-            if 'BADGE:' in generated_text and 'LINKEDIN_POST:' in generated_text:
-                parts = generated_text.split('LINKEDIN_POST:')
-                badge_part = parts[0].replace('BADGE:', '').strip()
-                linkedin_part = parts[1].strip()
-                badge_text = badge_part
-                linkedin_post = linkedin_part
-            else:
-                raise HTTPException(status_code=500, detail="Could not parse Gemini response")
-        
-        # Generate the badge SVG
-        badge_svg = generate_badge_svg(request.employeeName, badge_text, request.difficulty)
-        
-        # Convert SVG to base64 data URL
-        badge_base64 = base64.b64encode(badge_svg.encode('utf-8')).decode('utf-8')
-        badge_url = f"data:image/svg+xml;base64,{badge_base64}"
-        
-        # Store badge generation in database
-        badge_generation = BadgeGeneration(
-            user_id=user["id"],
-            user_name=user["name"],
-            employee_name=request.employeeName,
-            learning=request.learning,
-            difficulty=request.difficulty,
-            badge_text=badge_text,
-            linkedin_post=linkedin_post,
-            badge_url=badge_url
+    
+    if response.status_code != 200:
+        raise HTTPException(status_code=500, detail=f"Gemini API error: {response.text}")
+    
+    response_data = orjson.loads(response.content)
+    
+    # Extract the generated text
+    if not response_data.get('candidates') or not response_data['candidates'][0].get('content'):
+        raise HTTPException(status_code=500, detail="Invalid response from Gemini API")
+    
+    generated_text = response_data['candidates'][0]['content']['parts'][0]['text']
+    
+    # Parse the response to extract badge text and LinkedIn post
+    return parse_gemini_text(generated_text)
+
+# History/audit writes only need the primary's in-memory ack, not journal or majority
+LOW_PRIORITY_WRITE = WriteConcern(w=1, j=False)
+
+# user id -> latest activity time, flushed to users.last_active by last_active_sweeper
+last_active_buffer: Dict[str, datetime] = {}
+LAST_ACTIVE_FLUSH_INTERVAL = 5  # seconds
+
+def touch_last_active(user_id: str):
+    last_active_buffer[user_id] = datetime.utcnow()
+
+async def flush_last_active():
+    """Write buffered last_active times in one bulk_write"""
+    global last_active_buffer
+    if not last_active_buffer:
+        return
+    pending, last_active_buffer = last_active_buffer, {}
+    try:
+        # $max so a stale buffered time never overwrites a newer login
+        await db.users.with_options(write_concern=LOW_PRIORITY_WRITE).bulk_write(
+            [UpdateOne({"id": user_id}, {"$max": {"last_active": ts}}) for user_id, ts in pending.items()],
+            ordered=False
         )
-        await db.badge_generations.insert_one(badge_generation.dict())
-        
-        # Update user's badge count and last active
-        await db.users.update_one(
+    except Exception as e:
+        logger.error(f"Error flushing last_active for {len(pending)} users: {str(e)}")
+
+async def last_active_sweeper():
+    while True:
+        await asyncio.sleep(LAST_ACTIVE_FLUSH_INTERVAL)
+        await flush_last_active()
+
+async def record_badge_generation(user: dict, request: GenerateRequest, badge_text: str, linkedin_post: str) -> str:
+    """Render and store a generated badge, returning its /api/badge URL"""
+    # Render the badge SVG off the event loop; it is served from /api/badge/{digest}.svg
+    digest = badge_digest(request.employeeName, badge_text, request.difficulty)
+    if digest not in badge_svg_cache:
+        badge_svg_cache[digest] = await asyncio.to_thread(
+            generate_badge_svg, request.employeeName, badge_text, request.difficulty
+        )
+    badge_url = badge_path(digest)
+    
+    # Fields match BadgeGeneration; every value is already a validated str, so the
+    # document is built directly rather than through a model instance
+    badge_generation = {
+        "id": new_id(),
+        "user_id": user["id"],
+        "user_name": user["name"],
+        "employee_name": request.employeeName,
+        "learning": request.learning,
+        "difficulty": request.difficulty,
+        "badge_text": badge_text,
+        "linkedin_post": linkedin_post,
+        "badge_url": badge_url,
+        "created_at": datetime.utcnow()
+    }
+    
+    # Store the generation and bump the user's badge count concurrently
+    await asyncio.gather(
+        db.badge_generations.with_options(write_concern=LOW_PRIORITY_WRITE).insert_one(badge_generation),
+        db.users.with_options(write_concern=LOW_PRIORITY_WRITE).update_one(
             {"id": user["id"]},
-            {
-                "$inc": {"total_badges_generated": 1},
-                "$set": {"last_active": datetime.utcnow()}
-            }
+            {"$inc": {"total_badges_generated": 1}}
         )
+    )
+    touch_last_active(user["id"])
+    
+    return badge_url
+
+@api_router.post("/generate", responses={200: {"model": GenerateResponse}})
+async def generate_badge_and_post(request: GenerateRequest, session_token: str = Cookie(None)):
+    try:
+        if not GEMINI_API_KEY:
+            raise HTTPException(status_code=500, detail="Gemini API key not configured")
         
-        return GenerateResponse(
-            badgeUrl=badge_url,
-            linkedinPost=linkedin_post
+        # Verify user session
+        if not session_token:
+            raise HTTPException(status_code=401, detail="Authentication required")
+        
+        # Find user by session token (simple approach - in production use JWT)
+        user = await find_session_user(session_token)
+        if not user:
+            raise HTTPException(status_code=401, detail="Invalid session")
+
+        # Generate badge text and LinkedIn post (cached per input)
+        badge_text, linkedin_post = await gemini_generate(
+            request.employeeName, request.learning, request.difficulty
         )
         
+        badge_url = await record_badge_generation(user, request, badge_text, linkedin_post)
+        
+        # Both fields are already strings, so skip the Pydantic model roundtrip
+        return ORJSONResponse({"badgeUrl": badge_url, "linkedinPost": linkedin_post})
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating badge and post: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def sse_event(event: str, data) -> bytes:
+    """Encode one server-sent event with a JSON data line"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+async def gemini_stream(employee_name: str, learning: str, difficulty: str):
+    """Yield text chunks from Gemini's SSE streamGenerateContent endpoint
+
+    The caller holds the Gemini slot, so a busy worker is refused with 429
+    before the streaming response starts.
+    """
+    async with app.state.http.stream(
+        "POST",
+        GEMINI_STREAM_URL,
+        params={"alt": "sse", "key": GEMINI_API_KEY},
+        headers={"Content-Type": "application/json"},
+        content=gemini_badge_payload(employee_name, learning, difficulty)
+    ) as response:
+        if response.status_code != 200:
+            body = await response.aread()
+            raise HTTPException(status_code=500, detail=f"Gemini API error: {body.decode(errors='replace')}")
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            chunk = orjson.loads(line[5:])
+            for candidate in chunk.get('candidates', []):
+                for part in candidate.get('content', {}).get('parts', []):
+                    if part.get('text'):
+                        yield part['text']
+
+@api_router.post("/generate/stream")
+async def generate_badge_and_post_stream(request: GenerateRequest, session_token: str = Cookie(None)):
+    """Stream the LinkedIn post as it is generated, then the badge URL in a final event"""
+    if not GEMINI_API_KEY:
+        raise HTTPException(status_code=500, detail="Gemini API key not configured")
+    
+    if not session_token:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    
+    user = await find_session_user(session_token)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid session")
+    
+    cache_key = gemini_cache_key(request.employeeName, request.learning, request.difficulty)
+    cached = gemini_cache.get(cache_key)
+    slot_held = False
+    if cached is None:
+        # Taken before the 200 goes out so a full semaphore is a real 429 with
+        # Retry-After, rather than an error event inside a 200 stream
+        await acquire_gemini_slot()
+        slot_held = True
+    
+    def release_slot():
+        # events() releases as soon as the upstream stream ends; the background
+        # task covers a client that disconnects before events() ever starts
+        nonlocal slot_held
+        if slot_held:
+            slot_held = False
+            app.state.gemini_semaphore.release()
+    
+    async def events():
+        try:
+            if cached is not None:
+                badge_text, linkedin_post = cached
+                yield sse_event("post", linkedin_post)
+            else:
+                # Forward only the text after the LINKEDIN_POST: marker as it arrives
+                generated_text = ""
+                sent = 0
+                try:
+                    async for text in gemini_stream(request.employeeName, request.learning, request.difficulty):
+                        generated_text += text
+                        marker = generated_text.find("LINKEDIN_POST:")
+                        if marker == -1:
+                            continue
+                        post_so_far = generated_text[marker + len("LINKEDIN_POST:"):].lstrip()
+                        if len(post_so_far) > sent:
+                            yield sse_event("post", post_so_far[sent:])
+                            sent = len(post_so_far)
+                finally:
+                    release_slot()
+                badge_text, linkedin_post = parse_gemini_text(generated_text)
+                gemini_cache[cache_key] = (badge_text, linkedin_post)
+            
+            badge_url = await record_badge_generation(user, request, badge_text, linkedin_post)
+            yield sse_event("done", {"badgeUrl": badge_url, "linkedinPost": linkedin_post})
+        except Exception as e:
+            logger.error(f"Error streaming badge and post: {str(e)}")
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield sse_event("error", {"detail": detail})
+    
+    # Left uncompressed by StreamingAwareGZipMiddleware so each event is flushed as sent
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release_slot)
+    )
+
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
@@ -1542,15 +2027,19 @@ async def root():
 
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
-    status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
-    return status_obj
+    status_doc = {
+        "id": new_id(),
+        "client_name": input.client_name,
+        "timestamp": datetime.utcnow()
+    }
+    # Insert a copy so the returned document doesn't pick up Mongo's _id
+    await db.status_checks.insert_one(dict(status_doc))
+    return status_doc
 
-@api_router.get("/status", response_model=List[StatusCheck])
+@api_router.get("/status")
 async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+    # Stored documents already match StatusCheck, so skip re-validating them
+    return await db.status_checks.find({}, projection={"_id": 0}).to_list(1000)
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -1563,6 +2052,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Server-sent event streams must reach the client event by event; gzip would buffer them
+UNCOMPRESSED_PATHS = frozenset(("/api/generate/stream",))
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that passes the event-stream endpoints through uncompressed"""
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in UNCOMPRESSED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Compress JSON payloads and SVG badges; below ~500 bytes gzip framing isn't worth it
+app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=500, compresslevel=5)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -1570,6 +2073,201 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Indexes backing the hot lookups (session checks, per-user listings, monthly stats)
+MONGO_INDEXES = {
+    "users": [
+        IndexModel("session_token", unique=True, sparse=True),
+        IndexModel("id", unique=True),
+        IndexModel("name"),
+        IndexModel("role"),
+    ],
+    "employee_profiles": [
+        IndexModel("user_id", unique=True),
+    ],
+    "learning_goals": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel("id"),
+    ],
+    "milestones": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("month_year", ASCENDING), ("user_id", ASCENDING)]),
+    ],
+    "resources": [
+        IndexModel([("approved", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel("url"),
+    ],
+    "bookmarks": [
+        IndexModel([("user_id", ASCENDING), ("bookmarked_user_id", ASCENDING)], unique=True),
+    ],
+    "badge_generations": [
+        IndexModel("badge_url"),
+        IndexModel([("created_at", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+    "monthly_stats": [
+        IndexModel([("month_year", ASCENDING), ("user_id", ASCENDING)], unique=True),
+        IndexModel([("month_year", ASCENDING), ("total_hours", ASCENDING)]),
+    ],
+}
+
+async def ensure_indexes():
+    """Create MONGO_INDEXES; existing indexes are a no-op"""
+    results = await asyncio.gather(
+        *(db[name].create_indexes(indexes) for name, indexes in MONGO_INDEXES.items()),
+        return_exceptions=True
+    )
+    for name, result in zip(MONGO_INDEXES, results):
+        if isinstance(result, Exception):
+            # Don't block startup on e.g. duplicate legacy data under a unique index
+            logger.warning(f"Could not create indexes on {name}: {str(result)}")
+
+MONTHLY_STATS_BACKFILL = "monthly_stats_backfill"
+MIGRATION_LEASE = timedelta(minutes=10)
+
+async def backfill_monthly_stats():
+    """Seed monthly_stats from milestones created before the counters went live
+
+    A marker document in the migrations collection makes this run once across
+    all workers: the first worker to start claims it, a failed or abandoned run
+    is retried on a later startup, and a finished one is never repeated.
+    """
+    now = datetime.utcnow()
+    try:
+        marker = await db.migrations.find_one_and_update(
+            {
+                "_id": MONTHLY_STATS_BACKFILL,
+                "$or": [{"state": "failed"}, {"state": "running", "started_at": {"$lt": now - MIGRATION_LEASE}}]
+            },
+            # cutoff is fixed by the first claim: milestones from then on are
+            # counted live by bump_monthly_stats, so a retry must not re-add them
+            {"$set": {"state": "running", "started_at": now}, "$setOnInsert": {"cutoff": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Already done, or another worker holds the claim
+        return
+    
+    try:
+        await _aggregate(db.milestones, [
+            {"$match": {"created_at": {"$lt": marker["cutoff"]}}},
+            {"$group": {
+                "_id": {"user_id": "$user_id", "month_year": "$month_year"},
+                "total_hours": {"$sum": "$hours_invested"},
+                "count": {"$sum": 1}
+            }},
+            {"$project": {
+                "_id": 0,
+                "user_id": "$_id.user_id",
+                "month_year": "$_id.month_year",
+                "total_hours": 1,
+                "count": 1,
+                "backfilled_hours": "$total_hours",
+                "backfilled_count": "$count"
+            }},
+            # Add the historical totals to whatever the live counters already hold.
+            # backfilled_* records this run's share, so a retry after a partial
+            # $merge swaps it out instead of counting it twice
+            {"$merge": {
+                "into": "monthly_stats",
+                "on": ["month_year", "user_id"],
+                "whenMatched": [{"$set": {
+                    "total_hours": {"$add": [
+                        {"$subtract": ["$total_hours", {"$ifNull": ["$backfilled_hours", 0]}]},
+                        "$$new.total_hours"
+                    ]},
+                    "count": {"$add": [
+                        {"$subtract": ["$count", {"$ifNull": ["$backfilled_count", 0]}]},
+                        "$$new.count"
+                    ]},
+                    "backfilled_hours": "$$new.total_hours",
+                    "backfilled_count": "$$new.count"
+                }}],
+                "whenNotMatched": "insert"
+            }}
+        ])
+    except Exception:
+        await db.migrations.update_one({"_id": MONTHLY_STATS_BACKFILL}, {"$set": {"state": "failed"}})
+        raise
+    await db.migrations.update_one(
+        {"_id": MONTHLY_STATS_BACKFILL},
+        {"$set": {"state": "done", "finished_at": datetime.utcnow()}}
+    )
+
+@app.on_event("startup")
+async def startup_db_client():
+    # Each worker builds its own client; Mongo pools are not fork-safe. No
+    # minPoolSize: with WEB_CONCURRENCY = 2n+1 workers a per-process floor would
+    # hold (2n+1) x minPoolSize idle connections open before any traffic, so
+    # connections are opened on demand (the startup ping opens the first one)
+    global client, db
+    client = AsyncMongoClient(
+        mongo_url,
+        maxPoolSize=50,
+        serverSelectionTimeoutMS=3000,
+        connectTimeoutMS=3000,
+        socketTimeoutMS=10000,
+        waitQueueTimeoutMS=2000,
+        retryWrites=True,
+        compressors="zstd,zlib"
+    )
+    db = client[os.environ['DB_NAME']]
+    app.state.mongo = client
+    app.state.db = db
+    # Open the connection pool before serving traffic
+    await db.command("ping")
+    await ensure_indexes()
+    try:
+        await backfill_monthly_stats()
+    except Exception as e:
+        logger.warning(f"Could not backfill monthly_stats: {str(e)}")
+
+@app.on_event("startup")
+async def startup_http_client():
+    # Shared async HTTP client so outbound Gemini calls don't block the event loop.
+    # The pooled transport keeps TLS connections alive and retries failed connects.
+    app.state.http = httpx.AsyncClient(
+        timeout=httpx.Timeout(30.0, connect=3.0),
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100)
+        )
+    )
+    # Bounds in-flight Gemini calls per worker; callers shed load with 429 when full.
+    # Created here so it belongs to the serving loop, like the client it guards
+    app.state.gemini_semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+@app.on_event("startup")
+async def startup_audit_log_writer():
+    global audit_queue
+    audit_queue = asyncio.Queue()
+    app.state.audit_writer = asyncio.create_task(audit_log_writer())
+
+@app.on_event("startup")
+async def startup_last_active_sweeper():
+    app.state.last_active_sweeper = asyncio.create_task(last_active_sweeper())
+
+@app.on_event("shutdown")
+async def shutdown_last_active_sweeper():
+    app.state.last_active_sweeper.cancel()
+    await flush_last_active()
+
+@app.on_event("shutdown")
+async def shutdown_audit_log_writer():
+    # Flush queued audit records before the Mongo client closes
+    audit_queue.put_nowait(None)
+    await app.state.audit_writer
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await app.state.mongo.close()
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    await app.state.http.aclose()
+
+if __name__ == "__main__":
+    import uvicorn
+    workers = int(os.environ.get("WEB_CONCURRENCY", 2 * (os.cpu_count() or 1) + 1))
+    uvicorn.run("server:app", host="0.0.0.0", port=8001, workers=workers, loop="uvloop", http="httptools")
@@ -4,12 +4,26 @@ Backend API Testing for Branding Pioneers Learning Badge & LinkedIn Post Generat
 Tests authentication, admin functionality, and badge generation with comprehensive coverage
 """
 
-import requests
-import json
+import asyncio
+from array import array
 import base64
+import functools
+import hashlib
+import httpx
+import orjson
+from http.cookiejar import DefaultCookiePolicy
+import logging
+import logging.handlers
 import re
+import statistics
+import sys
 from typing import Dict, Any, Optional
 import os
+import pytest
+import time
+from itertools import chain
+from operator import itemgetter
+from pathlib import Path
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -19,75 +33,390 @@ load_dotenv('/app/frontend/.env')
 BACKEND_URL = os.environ.get('REACT_APP_BACKEND_URL', 'http://localhost:8001')
 API_BASE_URL = f"{BACKEND_URL}/api"
 
+class URL:
+    """Endpoint URLs, resolved once at import"""
+    ROOT = f"{API_BASE_URL}/"
+    LOGIN = f"{API_BASE_URL}/auth/login"
+    ME = f"{API_BASE_URL}/auth/me"
+    LOGOUT = f"{API_BASE_URL}/auth/logout"
+    STATS = f"{API_BASE_URL}/admin/stats"
+    USERS = f"{API_BASE_URL}/admin/users"
+    BADGES = f"{API_BASE_URL}/admin/badges"
+    ACTIONS = f"{API_BASE_URL}/admin/actions"
+    GENERATE = f"{API_BASE_URL}/generate"
+    PROFILE = f"{API_BASE_URL}/profile"
+    RECOMMENDATIONS = f"{API_BASE_URL}/recommendations"
+    RECOMMENDATIONS_REFRESH = f"{API_BASE_URL}/recommendations/refresh"
+
+# Unauthenticated calls should be rejected in one round trip; only real AI
+# generation gets a long read timeout
+FAST_TIMEOUT = httpx.Timeout(5.0, connect=2.0)
+AI_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+# A cached recommendations read skips Gemini entirely
+CACHED_RECOMMENDATIONS_MAX_SECONDS = 1.0
+CACHE_CHECK_REPLAYS = 5
+
+# Request bodies never change between runs, so serialize them once
+ADMIN_LOGIN_BODY = orjson.dumps({"name": "Arush T."})
+USER_LOGIN_BODY = orjson.dumps({"name": "John Doe"})
+LOGOUT_LOGIN_BODY = orjson.dumps({"name": "Logout Test User"})
+GENERATE_BODY = orjson.dumps({
+    "employeeName": "Sarah Johnson",
+    "learning": "Advanced Python data structures and algorithms",
+    "difficulty": "Moderate"
+})
+PROFILE_BODY = orjson.dumps({
+    "full_name": "John Doe",
+    "position": "Senior Software Engineer",
+    "department": "Engineering",
+    "date_of_joining": "2023-01-15T00:00:00Z",
+    "existing_skills": ["Python", "JavaScript", "React", "FastAPI", "MongoDB"],
+    "learning_interests": ["Machine Learning", "AI Development", "Cloud Architecture", "DevOps"]
+})
+ANON_GENERATE_BODY = orjson.dumps({
+    "employeeName": "Test User",
+    "learning": "Basic testing concepts",
+    "difficulty": "Easy"
+})
+
+# LinkedIn post must mention the learning topic and the company (case-insensitive)
+LINKEDIN_REQUIRED_ELEMENTS = ("Python", "Branding Pioneers")
+LINKEDIN_REQUIRED_RE = re.compile("|".join(map(re.escape, LINKEDIN_REQUIRED_ELEMENTS)), re.I)
+LOGGED_OUT_RE = re.compile(rb"logged out", re.I)
+
+# Fields each response must carry
+ADMIN_STATS_FIELDS = frozenset(("total_users", "total_admins", "total_badges_generated", "recent_activities", "top_learners"))
+PROFILE_FIELDS = frozenset(("id", "user_id", "full_name", "position", "department", "existing_skills", "learning_interests"))
+RECOMMENDATIONS_FIELDS = frozenset(("paid_recommendations", "unpaid_recommendations", "total_count", "personalization_factors"))
+RECOMMENDATION_ITEM_FIELDS = frozenset(("title", "description", "platform", "category", "difficulty_level", "reason"))
+
+# Recommendation text fields and their minimum useful length
+RECOMMENDATION_MIN_LENGTHS = (
+    ("title", 10, "Title too short or missing"),
+    ("description", 20, "Description too short or missing"),
+    ("reason", 15, "Reason too short or missing"),
+)
+DIFFICULTY_LEVELS = frozenset(("beginner", "intermediate", "advanced"))
+
+# Signs that a recommendation reason was written for this user, matched in one
+# pass; the group name tells a personal phrase from a skill mention
+REASON_KEYWORDS_RE = re.compile(
+    r"\b(?:(?P<personal>since you|for your|based on|given|considering|your|you)"
+    r"|(?P<skill>python|javascript|machine learning|ai|cloud|devops|react|fastapi))\b",
+    re.I,
+)
+
+# Admin listing endpoints: (URL, list field, test name, noun for the details line)
+ADMIN_LIST_ENDPOINTS = (
+    (URL.USERS, "users", "Admin Users Endpoint", "users"),
+    (URL.BADGES, "badges", "Admin Badges Endpoint", "badge generations"),
+    (URL.ACTIONS, "actions", "Admin Actions Endpoint", "admin actions"),
+)
+# The list checks only need the response shape, so fetch a small first page
+# rather than the default 100 rows; the body stays bounded as the tables grow
+ADMIN_LIST_PAGE_SIZE = 10
+
+# Branding Pioneers elements every badge must contain (matches the generate test data)
+SVG_REQUIRED_ELEMENTS = ("BRANDING", "PIONEERS", "Sarah Johnson", "Moderate")
+SVG_REQUIRED_RE = re.compile(b"|".join(re.escape(element.encode()) for element in SVG_REQUIRED_ELEMENTS))
+
+# Opt-in replay of anonymous rejections: CACHE_TTL_SECONDS > 0 enables it,
+# CACHE_REFRESH=1 forces every cached call back to the server. Both are env
+# vars so they work the same under the script and under pytest
+RESPONSE_CACHE_DIR = Path(__file__).resolve().parent / ".test_cache"
+RESPONSE_CACHE_TTL = float(os.environ.get("CACHE_TTL_SECONDS", "0"))
+REFRESH_RESPONSE_CACHE = bool(os.environ.get("CACHE_REFRESH"))
+
+# Transient statuses worth retrying: load shedding (429, e.g. the Gemini slot
+# limit on /generate) and gateway/upstream hiccups
+RETRY_STATUSES = frozenset((429, 502, 503, 504))
+# A gateway 5xx may arrive after the backend already handled the request, so
+# non-idempotent calls (login, generate, profile) are retried only on 429,
+# which means the request was turned away. Connect errors are retried by the
+# underlying transport for every method.
+NON_IDEMPOTENT_RETRY_STATUSES = frozenset((429,))
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 0.2
+# Upper bound on any single wait, however long a Retry-After asks for
+RETRY_MAX_DELAY = 5.0
+
+# Test output is buffered and written in batches; a failure (ERROR) flushes
+# everything logged so far straight away, and get_summary flushes the rest
+logger = logging.getLogger("backend_test")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+output_handler = logging.handlers.MemoryHandler(
+    capacity=200, flushLevel=logging.ERROR, target=logging.StreamHandler(sys.stdout))
+logger.addHandler(output_handler)
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Retry transient statuses with exponential backoff, honouring Retry-After"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        retry_statuses = RETRY_STATUSES if request.method in IDEMPOTENT_METHODS else NON_IDEMPOTENT_RETRY_STATUSES
+        for attempt in range(RETRY_ATTEMPTS):
+            response = await self.transport.handle_async_request(request)
+            if response.status_code not in retry_statuses:
+                return response
+            
+            retry_after = response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else RETRY_BACKOFF_SECONDS * 2 ** attempt
+            await response.aclose()
+            await asyncio.sleep(min(delay, RETRY_MAX_DELAY))
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+class ResponseCacheTransport(httpx.AsyncBaseTransport):
+    """Replay recorded 4xx responses for cookie-less GET/POST calls"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, ttl: float, refresh: bool = False):
+        self.transport = transport
+        self.ttl = ttl
+        self.refresh = refresh
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        # Only anonymous calls are deterministic; anything carrying a session is live
+        if request.method not in ("GET", "POST") or "cookie" in request.headers:
+            return await self.transport.handle_async_request(request)
+
+        body = await request.aread()
+        key = hashlib.sha1(b"\0".join((request.method.encode(), str(request.url).encode(), body))).hexdigest()
+        path = RESPONSE_CACHE_DIR / f"{key}.json"
+        if not self.refresh:
+            try:
+                if time.time() - path.stat().st_mtime < self.ttl:
+                    cached = orjson.loads(path.read_bytes())
+                    return httpx.Response(
+                        cached["status_code"],
+                        headers=cached["headers"],
+                        content=base64.b64decode(cached["content"]),
+                        request=request,
+                    )
+            except (OSError, ValueError, KeyError):
+                pass
+
+        response = await self.transport.handle_async_request(request)
+        content = await response.aread()
+        # Rejections are the deterministic part; successes must stay live
+        if not 400 <= response.status_code < 500:
+            return httpx.Response(response.status_code, headers=response.headers, content=content, request=request)
+        RESPONSE_CACHE_DIR.mkdir(exist_ok=True)
+        path.write_bytes(orjson.dumps({
+            "status_code": response.status_code,
+            "headers": response.headers.multi_items(),
+            "content": base64.b64encode(content).decode(),
+        }))
+        return httpx.Response(response.status_code, headers=response.headers, content=content, request=request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+def parse_json(response: httpx.Response):
+    """Parse a JSON body straight from bytes with orjson"""
+    return orjson.loads(response.content)
+
+def all_recommendations(data: Dict[Any, Any]):
+    """Iterate paid then unpaid recommendations without concatenating the lists"""
+    return chain(data.get("paid_recommendations", ()), data.get("unpaid_recommendations", ()))
+
+get_title = itemgetter("title")
+
+def recommendation_quality_issues(paid_recs, unpaid_recs) -> list:
+    """Describe every recommendation that is too thin or in the wrong category"""
+    issues = []
+    for label, recs, category in (("Paid", paid_recs, "paid"), ("Unpaid", unpaid_recs, "unpaid")):
+        for field, min_length, problem in RECOMMENDATION_MIN_LENGTHS:
+            lengths = map(len, (rec.get(field) or "" for rec in recs))
+            issues += [f"{label} rec {i}: {problem}" for i, length in enumerate(lengths, 1) if length < min_length]
+        issues += [f"{label} rec {i}: Category should be '{category}'"
+                   for i, rec in enumerate(recs, 1) if rec.get("category") != category]
+    issues += [f"Paid rec {i}: Price missing for paid recommendation"
+               for i, rec in enumerate(paid_recs, 1) if not rec.get("price")]
+    return issues
+
+def reason_keywords(recs):
+    """Distinct personalization and skill keywords in the reasons, in order of appearance"""
+    combined_reasons = " ".join(rec.get("reason", "") for rec in recs)
+    keywords = {"personal": {}, "skill": {}}
+    for match in REASON_KEYWORDS_RE.finditer(combined_reasons):
+        keywords[match.lastgroup][match.group().lower()] = None
+    return list(keywords["personal"]), list(keywords["skill"])
+
+def ai_quality_indicators(recs) -> list:
+    """Signs that a set of recommendations was generated rather than stubbed"""
+    indicators = []
+    total_recs = len(recs)
+    
+    # Check for variety in platforms
+    platforms = {platform.lower() for platform in (rec.get("platform") for rec in recs) if platform}
+    if len(platforms) >= 3:
+        indicators.append(f"Platform variety: {len(platforms)} different platforms")
+    
+    # Check for realistic difficulty levels
+    difficulty_levels = {rec.get("difficulty_level", "").lower() for rec in recs} & DIFFICULTY_LEVELS
+    if len(difficulty_levels) >= 2:
+        indicators.append(f"Difficulty variety: {difficulty_levels}")
+    
+    # Check for realistic time estimates
+    time_estimates = [hours for hours in (rec.get("estimated_hours", 0) for rec in recs)
+                      if isinstance(hours, int) and 1 <= hours <= 100]
+    if len(time_estimates) >= total_recs * 0.8:  # At least 80% have realistic time estimates
+        indicators.append(f"Realistic time estimates: {len(time_estimates)}/{total_recs}")
+    
+    # Check for proper URL structure
+    valid_urls = sum(1 for url in (rec.get("url", "") for rec in recs)
+                     if url and ("http" in url or "www." in url or ".com" in url))
+    if valid_urls >= total_recs * 0.7:  # At least 70% have valid-looking URLs
+        indicators.append(f"Valid URLs: {valid_urls}/{total_recs}")
+    
+    return indicators
+
+def body_digest(response: httpx.Response) -> bytes:
+    """Short fingerprint of a response body for equality checks"""
+    return hashlib.blake2b(response.content, digest_size=16).digest()
+
+def new_session(accept_cookies: bool = True, cache_ttl: float = 0) -> httpx.AsyncClient:
+    """Create a keep-alive client with a sized connection pool"""
+    # HTTP/2 multiplexes a role's calls over one connection where the
+    # deployment negotiates it (TLS/ALPN); plain http stays on HTTP/1.1.
+    # Connection failures are retried so a dropped socket doesn't fail a test.
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    )
+    transport = RetryTransport(transport)
+    if cache_ttl > 0:
+        transport = ResponseCacheTransport(transport, cache_ttl, refresh=REFRESH_RESPONSE_CACHE)
+    http = httpx.AsyncClient(
+        transport=transport,
+        # Test payloads are small JSON: skip gzip negotiation and keep sockets open
+        headers={
+            "Content-Type": "application/json",
+            "Accept-Encoding": "identity",
+            "Connection": "keep-alive",
+        },
+    )
+    if not accept_cookies:
+        http.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return http
+
+def http_test(test_name: str, failure: str, default: Any = False):
+    """Log an exception escaping an async check as that check's failure and return default"""
+    def decorate(check):
+        @functools.wraps(check)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await check(self, *args, **kwargs)
+            except Exception as e:
+                self.log_test(test_name, False, f"{failure}: {str(e)}")
+                return default
+        return wrapper
+    return decorate
+
 class BackendTester:
-    def __init__(self):
-        self.test_results = []
+    def __init__(self, session: Optional[httpx.AsyncClient] = None):
+        # Results are kept column-wise: one list per field, pass/fail as bytes
+        self.result_names = []
+        self.result_status = array("b")
+        self.result_messages = []
+        self.result_details = []
+        # Row indices of the failures, recorded as they happen for the summary
+        self.failed_indices = []
         self.passed_tests = 0
         self.failed_tests = 0
-        self.admin_session = None
-        self.user_session = None
+        # QUIET_TESTS=1 prints only failures plus one summary block at the end
+        self.quiet = bool(os.environ.get("QUIET_TESTS"))
+        # The shared session is anonymous: its jar never picks up a login
+        # cookie. Each role gets its own pooled session holding its cookie.
+        self.session = session or new_session(accept_cookies=False, cache_ttl=RESPONSE_CACHE_TTL)
+        self.admin_http: Optional[httpx.AsyncClient] = None
+        self.user_http: Optional[httpx.AsyncClient] = None
+        # Digest of the first /recommendations body, for the cache check
+        self.recommendations_digest: Optional[bytes] = None
+        self.recommendations_etag: Optional[str] = None
+
+    async def close(self):
+        """Release pooled connections"""
+        for http in (self.session, self.admin_http, self.user_http):
+            if http is not None:
+                await http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
         
     def log_test(self, test_name: str, passed: bool, message: str, details: str = ""):
         """Log test results"""
-        status = "✅ PASS" if passed else "❌ FAIL"
-        self.test_results.append({
-            'test': test_name,
-            'status': status,
-            'message': message,
-            'details': details
-        })
+        self.result_names.append(test_name)
+        self.result_status.append(passed)
+        self.result_messages.append(message)
+        self.result_details.append(details)
         
         if passed:
             self.passed_tests += 1
         else:
+            self.failed_indices.append(len(self.result_names) - 1)
             self.failed_tests += 1
             
-        print(f"{status}: {test_name}")
-        print(f"   {message}")
+        if self.quiet and passed:
+            return
+        status = "✅ PASS" if passed else "❌ FAIL"
+        msg = f"{status}: {test_name}\n   {message}\n"
         if details:
-            print(f"   Details: {details}")
-        print()
+            msg += f"   Details: {details}\n"
+        logger.log(logging.INFO if passed else logging.ERROR, msg)
+
+    def section(self, title: str):
+        """Print a section banner unless running quietly"""
+        if not self.quiet:
+            logger.info(f"\n{'=' * 60}\n{title}\n{'=' * 60}")
 
-    def test_api_health(self):
+    @http_test("API Health Check", "Failed to connect to API")
+    async def test_api_health(self):
         """Test basic API connectivity"""
-        try:
-            response = requests.get(f"{API_BASE_URL}/", timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                if "Branding Pioneers" in data.get("message", ""):
-                    self.log_test("API Health Check", True, "API is accessible and responding correctly")
-                    return True
-                else:
-                    self.log_test("API Health Check", False, "API responding but unexpected message", str(data))
-                    return False
+        response = await self.session.get(URL.ROOT, timeout=10)
+        if response.status_code == 200:
+            # Only one string matters here, so skip parsing the JSON
+            if b"Branding Pioneers" in response.content:
+                self.log_test("API Health Check", True, "API is accessible and responding correctly")
+                return True
             else:
-                self.log_test("API Health Check", False, f"API returned status {response.status_code}", response.text)
+                self.log_test("API Health Check", False, "API responding but unexpected message", response.text)
                 return False
-        except Exception as e:
-            self.log_test("API Health Check", False, f"Failed to connect to API: {str(e)}")
+        else:
+            self.log_test("API Health Check", False, f"API returned status {response.status_code}", response.text)
             return False
 
-    def test_admin_login(self):
+    @http_test("Admin Login", "Failed to login admin", None)
+    async def test_admin_login(self):
         """Test admin login with 'Arush T.' - should get admin role"""
-        test_data = {"name": "Arush T."}
+        http = new_session()
         
         try:
-            response = requests.post(
-                f"{API_BASE_URL}/auth/login",
-                json=test_data,
-                headers={"Content-Type": "application/json"},
+            response = await http.post(
+                URL.LOGIN,
+                content=ADMIN_LOGIN_BODY,
                 timeout=10
             )
-            
+        
             if response.status_code == 200:
-                data = response.json()
-                
+                data = parse_json(response)
+            
                 # Check response structure
                 if "user" in data and "session_token" in data:
                     user = data["user"]
                     if user.get("name") == "Arush T." and user.get("role") == "admin":
-                        # Store session for later tests
-                        self.admin_session = response.cookies.get('session_token')
+                        # Keep the logged-in session for later tests
+                        self.admin_http = http
                         self.log_test("Admin Login", True, 
                                     "Admin login successful - 'Arush T.' assigned admin role correctly",
                                     f"User role: {user.get('role')}, Session stored")
@@ -106,33 +435,32 @@ class BackendTester:
                             f"Login failed with status {response.status_code}",
                             response.text)
                 return None
-                
-        except Exception as e:
-            self.log_test("Admin Login", False,
-                        f"Failed to login admin: {str(e)}")
-            return None
+        finally:
+            # Only a successful login keeps its client; close it otherwise
+            if self.admin_http is not http:
+                await http.aclose()
 
-    def test_user_login(self):
+    @http_test("Regular User Login", "Failed to login user", None)
+    async def test_user_login(self):
         """Test regular user login with 'John Doe' - should get user role"""
-        test_data = {"name": "John Doe"}
+        http = new_session()
         
         try:
-            response = requests.post(
-                f"{API_BASE_URL}/auth/login",
-                json=test_data,
-                headers={"Content-Type": "application/json"},
+            response = await http.post(
+                URL.LOGIN,
+                content=USER_LOGIN_BODY,
                 timeout=10
             )
-            
+        
             if response.status_code == 200:
-                data = response.json()
-                
+                data = parse_json(response)
+            
                 # Check response structure
                 if "user" in data and "session_token" in data:
                     user = data["user"]
                     if user.get("name") == "John Doe" and user.get("role") == "user":
-                        # Store session for later tests
-                        self.user_session = response.cookies.get('session_token')
+                        # Keep the logged-in session for later tests
+                        self.user_http = http
                         self.log_test("Regular User Login", True, 
                                     "Regular user login successful - assigned user role correctly",
                                     f"User role: {user.get('role')}, Session stored")
@@ -151,457 +479,299 @@ class BackendTester:
                             f"Login failed with status {response.status_code}",
                             response.text)
                 return None
-                
-        except Exception as e:
-            self.log_test("Regular User Login", False,
-                        f"Failed to login user: {str(e)}")
-            return None
+        finally:
+            # Only a successful login keeps its client; close it otherwise
+            if self.user_http is not http:
+                await http.aclose()
 
-    def test_auth_me_endpoint(self):
+    @http_test("Auth Me Endpoint", "Failed to verify session")
+    async def test_auth_me_endpoint(self):
         """Test /api/auth/me endpoint with admin session"""
-        if not self.admin_session:
+        if self.admin_http is None:
             self.log_test("Auth Me Endpoint", False, "No admin session available for testing")
             return False
             
-        try:
-            cookies = {'session_token': self.admin_session}
-            response = requests.get(
-                f"{API_BASE_URL}/auth/me",
-                cookies=cookies,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("name") == "Arush T." and data.get("role") == "admin":
-                    self.log_test("Auth Me Endpoint", True, 
-                                "Session verification successful - returns correct user info",
-                                f"Name: {data.get('name')}, Role: {data.get('role')}")
-                    return True
-                else:
-                    self.log_test("Auth Me Endpoint", False,
-                                f"Incorrect user info returned. Name: {data.get('name')}, Role: {data.get('role')}")
-                    return False
+        response = await self.admin_http.get(
+            URL.ME,
+            timeout=10
+        )
+        
+        if response.status_code == 200:
+            data = parse_json(response)
+            if data.get("name") == "Arush T." and data.get("role") == "admin":
+                self.log_test("Auth Me Endpoint", True, 
+                            "Session verification successful - returns correct user info",
+                            f"Name: {data.get('name')}, Role: {data.get('role')}")
+                return True
             else:
                 self.log_test("Auth Me Endpoint", False,
-                            f"Auth me failed with status {response.status_code}",
-                            response.text)
+                            f"Incorrect user info returned. Name: {data.get('name')}, Role: {data.get('role')}")
                 return False
-                
-        except Exception as e:
+        else:
             self.log_test("Auth Me Endpoint", False,
-                        f"Failed to verify session: {str(e)}")
+                        f"Auth me failed with status {response.status_code}",
+                        response.text)
             return False
 
-    def test_logout_endpoint(self):
+    @http_test("Logout Endpoint", "Failed to logout")
+    async def test_logout_endpoint(self):
         """Test /api/auth/logout endpoint"""
-        if not self.user_session:
+        if self.user_http is None:
             self.log_test("Logout Endpoint", False, "No user session available for testing")
             return False
             
-        try:
-            cookies = {'session_token': self.user_session}
-            response = requests.post(
-                f"{API_BASE_URL}/auth/logout",
-                cookies=cookies,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if "message" in data and "logged out" in data["message"].lower():
-                    self.log_test("Logout Endpoint", True, 
-                                "Logout successful - session cleared",
-                                f"Response: {data.get('message')}")
-                    return True
-                else:
-                    self.log_test("Logout Endpoint", False,
-                                "Unexpected logout response",
-                                f"Response: {data}")
-                    return False
+        response = await self.user_http.post(
+            URL.LOGOUT,
+            timeout=10
+        )
+        
+        if response.status_code == 200:
+            if LOGGED_OUT_RE.search(response.content):
+                self.log_test("Logout Endpoint", True, 
+                            "Logout successful - session cleared",
+                            f"Response: {response.text}")
+                return True
             else:
                 self.log_test("Logout Endpoint", False,
-                            f"Logout failed with status {response.status_code}",
-                            response.text)
+                            "Unexpected logout response",
+                            f"Response: {response.text}")
                 return False
-                
-        except Exception as e:
+        else:
             self.log_test("Logout Endpoint", False,
-                        f"Failed to logout: {str(e)}")
+                        f"Logout failed with status {response.status_code}",
+                        response.text)
             return False
 
-    def test_admin_stats_with_admin(self):
+    @http_test("Admin Stats (Admin Access)", "Failed to get admin stats")
+    async def test_admin_stats_with_admin(self):
         """Test /api/admin/stats endpoint with admin session - should work"""
-        if not self.admin_session:
+        if self.admin_http is None:
             self.log_test("Admin Stats (Admin Access)", False, "No admin session available for testing")
             return False
             
-        try:
-            cookies = {'session_token': self.admin_session}
-            response = requests.get(
-                f"{API_BASE_URL}/admin/stats",
-                cookies=cookies,
-                timeout=10
-            )
+        response = await self.admin_http.get(
+            URL.STATS,
+            timeout=10
+        )
+        
+        if response.status_code == 200:
+            data = parse_json(response)
+            missing_fields = sorted(ADMIN_STATS_FIELDS - data.keys())
             
-            if response.status_code == 200:
-                data = response.json()
-                required_fields = ["total_users", "total_admins", "total_badges_generated", "recent_activities", "top_learners"]
-                missing_fields = [field for field in required_fields if field not in data]
-                
-                if not missing_fields:
-                    self.log_test("Admin Stats (Admin Access)", True, 
-                                "Admin stats endpoint accessible with admin session",
-                                f"Stats: {data.get('total_users')} users, {data.get('total_admins')} admins, {data.get('total_badges_generated')} badges")
-                    return True
-                else:
-                    self.log_test("Admin Stats (Admin Access)", False,
-                                f"Admin stats response missing fields: {missing_fields}",
-                                f"Available fields: {list(data.keys())}")
-                    return False
+            if not missing_fields:
+                self.log_test("Admin Stats (Admin Access)", True, 
+                            "Admin stats endpoint accessible with admin session",
+                            f"Stats: {data.get('total_users')} users, {data.get('total_admins')} admins, {data.get('total_badges_generated')} badges")
+                return True
             else:
                 self.log_test("Admin Stats (Admin Access)", False,
-                            f"Admin stats failed with status {response.status_code}",
-                            response.text)
+                            f"Admin stats response missing fields: {missing_fields}",
+                            f"Available fields: {list(data.keys())}")
                 return False
-                
-        except Exception as e:
+        else:
             self.log_test("Admin Stats (Admin Access)", False,
-                        f"Failed to get admin stats: {str(e)}")
+                        f"Admin stats failed with status {response.status_code}",
+                        response.text)
             return False
 
-    def test_admin_stats_with_user(self):
+    @http_test("Admin Stats (User Access)", "Failed to test user access to admin stats")
+    async def test_admin_stats_with_user(self):
         """Test /api/admin/stats endpoint with regular user session - should return 403"""
-        # Create a new user session for this test
-        test_data = {"name": "Regular User"}
-        
-        try:
-            # Login as regular user
-            response = requests.post(
-                f"{API_BASE_URL}/auth/login",
-                json=test_data,
-                headers={"Content-Type": "application/json"},
-                timeout=10
-            )
-            
-            if response.status_code != 200:
-                self.log_test("Admin Stats (User Access)", False, "Failed to create test user session")
-                return False
-                
-            user_session = response.cookies.get('session_token')
-            
-            # Try to access admin stats
-            cookies = {'session_token': user_session}
-            response = requests.get(
-                f"{API_BASE_URL}/admin/stats",
-                cookies=cookies,
-                timeout=10
-            )
+        if self.user_http is None:
+            self.log_test("Admin Stats (User Access)", False, "No user session available for testing")
+            return False
             
-            if response.status_code == 403:
-                self.log_test("Admin Stats (User Access)", True, 
-                            "Admin stats correctly blocked for regular user - returned 403 Forbidden",
-                            "Access control working properly")
-                return True
-            else:
-                self.log_test("Admin Stats (User Access)", False,
-                            f"Admin stats should return 403 for regular user, got {response.status_code}",
-                            response.text)
-                return False
-                
-        except Exception as e:
+        # The regular user session from test_user_login is already non-admin
+        response = await self.user_http.get(
+            URL.STATS,
+            timeout=10
+        )
+        
+        if response.status_code == 403:
+            self.log_test("Admin Stats (User Access)", True, 
+                        "Admin stats correctly blocked for regular user - returned 403 Forbidden",
+                        "Access control working properly")
+            return True
+        else:
             self.log_test("Admin Stats (User Access)", False,
-                        f"Failed to test user access to admin stats: {str(e)}")
+                        f"Admin stats should return 403 for regular user, got {response.status_code}",
+                        response.text)
             return False
 
-    def test_admin_stats_without_auth(self):
+    @http_test("Admin Stats (No Auth)", "Failed to test unauthenticated access to admin stats")
+    async def test_admin_stats_without_auth(self):
         """Test /api/admin/stats endpoint without authentication - should return 401"""
-        try:
-            response = requests.get(
-                f"{API_BASE_URL}/admin/stats",
-                timeout=10
-            )
-            
-            if response.status_code == 401:
-                self.log_test("Admin Stats (No Auth)", True, 
-                            "Admin stats correctly blocked without authentication - returned 401 Unauthorized",
-                            "Authentication requirement working properly")
-                return True
-            else:
-                self.log_test("Admin Stats (No Auth)", False,
-                            f"Admin stats should return 401 without auth, got {response.status_code}",
-                            response.text)
-                return False
-                
-        except Exception as e:
+        response = await self.session.get(
+            URL.STATS,
+            timeout=FAST_TIMEOUT
+        )
+        
+        if response.status_code == 401:
+            self.log_test("Admin Stats (No Auth)", True, 
+                        "Admin stats correctly blocked without authentication - returned 401 Unauthorized",
+                        "Authentication requirement working properly")
+            return True
+        else:
             self.log_test("Admin Stats (No Auth)", False,
-                        f"Failed to test unauthenticated access to admin stats: {str(e)}")
+                        f"Admin stats should return 401 without auth, got {response.status_code}",
+                        response.text)
             return False
 
-    def test_admin_users_endpoint(self):
-        """Test /api/admin/users endpoint with admin session"""
-        if not self.admin_session:
-            self.log_test("Admin Users Endpoint", False, "No admin session available for testing")
+    async def test_admin_list_endpoint(self, url: str, field: str, test_name: str, noun: str):
+        """Test an admin listing endpoint with admin session - should return a list under `field`"""
+        if self.admin_http is None:
+            self.log_test(test_name, False, "No admin session available for testing")
             return False
             
         try:
-            cookies = {'session_token': self.admin_session}
-            response = requests.get(
-                f"{API_BASE_URL}/admin/users",
-                cookies=cookies,
+            response = await self.admin_http.get(
+                url,
+                params={"limit": ADMIN_LIST_PAGE_SIZE},
                 timeout=10
             )
             
             if response.status_code == 200:
-                data = response.json()
-                if "users" in data and isinstance(data["users"], list):
-                    self.log_test("Admin Users Endpoint", True, 
-                                "Admin users endpoint working - returns user list",
-                                f"Found {len(data['users'])} users")
+                data = parse_json(response)
+                if isinstance(data.get(field), list):
+                    self.log_test(test_name, True, 
+                                f"{test_name} working - returns {noun} list",
+                                f"Found {len(data[field])} {noun} on the first page (limit {ADMIN_LIST_PAGE_SIZE})")
                     return True
                 else:
-                    self.log_test("Admin Users Endpoint", False,
-                                "Admin users response missing 'users' field or not a list",
+                    self.log_test(test_name, False,
+                                f"{test_name} response missing '{field}' field or not a list",
                                 f"Response keys: {list(data.keys())}")
                     return False
             else:
-                self.log_test("Admin Users Endpoint", False,
-                            f"Admin users failed with status {response.status_code}",
+                self.log_test(test_name, False,
+                            f"{test_name} failed with status {response.status_code}",
                             response.text)
                 return False
                 
         except Exception as e:
-            self.log_test("Admin Users Endpoint", False,
-                        f"Failed to get admin users: {str(e)}")
+            self.log_test(test_name, False,
+                        f"Failed to get {url}: {str(e)}")
             return False
 
-    def test_admin_badges_endpoint(self):
-        """Test /api/admin/badges endpoint with admin session"""
-        if not self.admin_session:
-            self.log_test("Admin Badges Endpoint", False, "No admin session available for testing")
-            return False
-            
-        try:
-            cookies = {'session_token': self.admin_session}
-            response = requests.get(
-                f"{API_BASE_URL}/admin/badges",
-                cookies=cookies,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if "badges" in data and isinstance(data["badges"], list):
-                    self.log_test("Admin Badges Endpoint", True, 
-                                "Admin badges endpoint working - returns badge list",
-                                f"Found {len(data['badges'])} badge generations")
-                    return True
-                else:
-                    self.log_test("Admin Badges Endpoint", False,
-                                "Admin badges response missing 'badges' field or not a list",
-                                f"Response keys: {list(data.keys())}")
-                    return False
-            else:
-                self.log_test("Admin Badges Endpoint", False,
-                            f"Admin badges failed with status {response.status_code}",
-                            response.text)
-                return False
-                
-        except Exception as e:
-            self.log_test("Admin Badges Endpoint", False,
-                        f"Failed to get admin badges: {str(e)}")
-            return False
-
-    def test_admin_actions_endpoint(self):
-        """Test /api/admin/actions endpoint with admin session"""
-        if not self.admin_session:
-            self.log_test("Admin Actions Endpoint", False, "No admin session available for testing")
-            return False
-            
-        try:
-            cookies = {'session_token': self.admin_session}
-            response = requests.get(
-                f"{API_BASE_URL}/admin/actions",
-                cookies=cookies,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if "actions" in data and isinstance(data["actions"], list):
-                    self.log_test("Admin Actions Endpoint", True, 
-                                "Admin actions endpoint working - returns action log",
-                                f"Found {len(data['actions'])} admin actions")
-                    return True
-                else:
-                    self.log_test("Admin Actions Endpoint", False,
-                                "Admin actions response missing 'actions' field or not a list",
-                                f"Response keys: {list(data.keys())}")
-                    return False
-            else:
-                self.log_test("Admin Actions Endpoint", False,
-                            f"Admin actions failed with status {response.status_code}",
-                            response.text)
-                return False
-                
-        except Exception as e:
-            self.log_test("Admin Actions Endpoint", False,
-                        f"Failed to get admin actions: {str(e)}")
-            return False
-
-    def test_badge_generation_with_auth(self):
+    @http_test("Badge Generation (With Auth)", "Failed to generate badge with auth", None)
+    async def test_badge_generation_with_auth(self):
         """Test /api/generate endpoint with authenticated user session - should work"""
-        if not self.admin_session:
+        if self.admin_http is None:
             self.log_test("Badge Generation (With Auth)", False, "No admin session available for testing")
             return None
             
-        test_data = {
-            "employeeName": "Sarah Johnson",
-            "learning": "Advanced Python data structures and algorithms", 
-            "difficulty": "Moderate"
-        }
-        
-        try:
-            cookies = {'session_token': self.admin_session}
-            response = requests.post(
-                f"{API_BASE_URL}/generate",
-                json=test_data,
-                cookies=cookies,
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
+        response = await self.admin_http.post(
+            URL.GENERATE,
+            content=GENERATE_BODY,
+            timeout=AI_TIMEOUT
+        )
+        
+        if response.status_code == 200:
+            data = parse_json(response)
             
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Check if response has required fields
-                if "badgeUrl" in data and "linkedinPost" in data:
-                    self.log_test("Badge Generation (With Auth)", True, 
-                                "Badge generation successful with authentication - creates database entries",
-                                f"Response keys: {list(data.keys())}")
-                    return data
-                else:
-                    self.log_test("Badge Generation (With Auth)", False,
-                                "Response missing required fields (badgeUrl, linkedinPost)",
-                                f"Received: {list(data.keys())}")
-                    return None
+            # Check if response has required fields
+            if "badgeUrl" in data and "linkedinPost" in data:
+                self.log_test("Badge Generation (With Auth)", True, 
+                            "Badge generation successful with authentication - creates database entries",
+                            f"Response keys: {list(data.keys())}")
+                return data
             else:
                 self.log_test("Badge Generation (With Auth)", False,
-                            f"Badge generation failed with status {response.status_code}",
-                            response.text)
+                            "Response missing required fields (badgeUrl, linkedinPost)",
+                            f"Received: {list(data.keys())}")
                 return None
-                
-        except Exception as e:
+        else:
             self.log_test("Badge Generation (With Auth)", False,
-                        f"Failed to generate badge with auth: {str(e)}")
+                        f"Badge generation failed with status {response.status_code}",
+                        response.text)
             return None
 
-    def test_badge_generation_without_auth(self):
+    @http_test("Badge Generation (No Auth)", "Failed to test unauthenticated badge generation")
+    async def test_badge_generation_without_auth(self):
         """Test /api/generate endpoint without authentication - should return 401"""
-        test_data = {
-            "employeeName": "Test User",
-            "learning": "Basic testing concepts", 
-            "difficulty": "Easy"
-        }
-        
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/generate",
-                json=test_data,
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
+        response = await self.session.post(
+            URL.GENERATE,
+            content=ANON_GENERATE_BODY,
+            timeout=FAST_TIMEOUT
+        )
+        
+        # Accept both 401 and 500 if the error message indicates authentication is required
+        if response.status_code == 401:
+            self.log_test("Badge Generation (No Auth)", True, 
+                        "Badge generation correctly blocked without authentication - returned 401",
+                        "Authentication requirement working properly")
+            return True
+        elif response.status_code == 500:
+            # Check if the error message indicates authentication is required
+            try:
+                error_data = parse_json(response)
+                if "401" in str(error_data.get("detail", "")) or "Authentication required" in str(error_data.get("detail", "")):
+                    self.log_test("Badge Generation (No Auth)", True, 
+                                "Badge generation correctly blocked without authentication - returned 500 with auth error",
+                                f"Error detail: {error_data.get('detail')}")
+                    return True
+            except:
+                pass
             
-            # Accept both 401 and 500 if the error message indicates authentication is required
-            if response.status_code == 401:
-                self.log_test("Badge Generation (No Auth)", True, 
-                            "Badge generation correctly blocked without authentication - returned 401",
-                            "Authentication requirement working properly")
-                return True
-            elif response.status_code == 500:
-                # Check if the error message indicates authentication is required
-                try:
-                    error_data = response.json()
-                    if "401" in str(error_data.get("detail", "")) or "Authentication required" in str(error_data.get("detail", "")):
-                        self.log_test("Badge Generation (No Auth)", True, 
-                                    "Badge generation correctly blocked without authentication - returned 500 with auth error",
-                                    f"Error detail: {error_data.get('detail')}")
-                        return True
-                except:
-                    pass
-                
-                self.log_test("Badge Generation (No Auth)", False,
-                            f"Badge generation returned 500 but not for authentication reasons",
-                            response.text)
-                return False
-            else:
-                self.log_test("Badge Generation (No Auth)", False,
-                            f"Badge generation should return 401 without auth, got {response.status_code}",
-                            response.text)
-                return False
-                
-        except Exception as e:
             self.log_test("Badge Generation (No Auth)", False,
-                        f"Failed to test unauthenticated badge generation: {str(e)}")
+                        f"Badge generation returned 500 but not for authentication reasons",
+                        response.text)
+            return False
+        else:
+            self.log_test("Badge Generation (No Auth)", False,
+                        f"Badge generation should return 401 without auth, got {response.status_code}",
+                        response.text)
             return False
 
-    def test_svg_badge_generation(self, api_response: Dict[Any, Any]):
-        """Test SVG badge generation and base64 encoding"""
+    @http_test("SVG Badge Generation", "Failed to fetch or validate SVG")
+    async def test_svg_badge_generation(self, api_response: Dict[Any, Any]):
+        """Test SVG badge generation and the badge SVG endpoint"""
         if not api_response or "badgeUrl" not in api_response:
             self.log_test("SVG Badge Generation", False, "No badge URL in API response")
             return False
             
         badge_url = api_response["badgeUrl"]
         
-        # Check if it's a proper data URL
-        if not badge_url.startswith("data:image/svg+xml;base64,"):
+        # Check that the badge points at the SVG endpoint
+        if not (badge_url.startswith("/api/badge/") and badge_url.endswith(".svg")):
             self.log_test("SVG Badge Generation", False,
-                        "Badge URL is not a proper base64 SVG data URL",
+                        "Badge URL does not point at the badge SVG endpoint",
                         f"URL starts with: {badge_url[:50]}...")
             return False
         
-        try:
-            # Extract base64 content
-            base64_content = badge_url.split("data:image/svg+xml;base64,")[1]
-            
-            # Decode base64 to get SVG content
-            svg_content = base64.b64decode(base64_content).decode('utf-8')
-            
-            # Validate SVG structure
-            if not svg_content.strip().startswith('<svg'):
-                self.log_test("SVG Badge Generation", False,
-                            "Decoded content is not valid SVG",
-                            f"Content starts with: {svg_content[:100]}...")
-                return False
-            
-            # Check for Branding Pioneers elements (updated for current test data)
-            required_elements = [
-                "BRANDING",
-                "PIONEERS", 
-                "Sarah Johnson",  # Employee name from current test data
-                "Moderate"        # Difficulty level
-            ]
-            
-            missing_elements = []
-            for element in required_elements:
-                if element not in svg_content:
-                    missing_elements.append(element)
-            
-            if missing_elements:
-                self.log_test("SVG Badge Generation", False,
-                            f"SVG missing required branding elements: {missing_elements}",
-                            f"SVG length: {len(svg_content)} chars")
-                return False
-            
-            self.log_test("SVG Badge Generation", True,
-                        "SVG badge generated correctly with Branding Pioneers branding and base64 encoding",
-                        f"SVG contains all required elements, length: {len(svg_content)} chars")
-            return True
-            
-        except Exception as e:
+        # Fetch the rendered SVG
+        response = await self.session.get(f"{BACKEND_URL}{badge_url}", timeout=10)
+        
+        if response.status_code != 200 or not response.headers.get("Content-Type", "").startswith("image/svg+xml"):
+            self.log_test("SVG Badge Generation", False,
+                        f"Badge endpoint returned status {response.status_code} ({response.headers.get('Content-Type')})",
+                        response.text[:200])
+            return False
+        
+        # Validate the raw body; only decode it for error details
+        svg_bytes = response.content
+        
+        # Validate SVG structure
+        if not svg_bytes.lstrip().startswith(b'<svg'):
+            self.log_test("SVG Badge Generation", False,
+                        "Decoded content is not valid SVG",
+                        f"Content starts with: {svg_bytes[:100].decode('utf-8', 'replace')}...")
+            return False
+        
+        # Check for Branding Pioneers elements in a single pass
+        found = {match.decode() for match in SVG_REQUIRED_RE.findall(svg_bytes)}
+        missing_elements = [element for element in SVG_REQUIRED_ELEMENTS if element not in found]
+        
+        if missing_elements:
             self.log_test("SVG Badge Generation", False,
-                        f"Failed to decode or validate SVG: {str(e)}")
+                        f"SVG missing required branding elements: {missing_elements}",
+                        f"SVG length: {len(svg_bytes)} bytes")
             return False
+        
+        self.log_test("SVG Badge Generation", True,
+                    "SVG badge generated correctly with Branding Pioneers branding and served as image/svg+xml",
+                    f"SVG contains all required elements, length: {len(svg_bytes)} bytes")
+        return True
 
     def test_linkedin_post_generation(self, api_response: Dict[Any, Any]):
         """Test LinkedIn post generation quality"""
@@ -619,15 +789,8 @@ class BackendTester:
         
         # Check for key elements that should be in a good LinkedIn post
         # Note: LinkedIn post is for the logged-in user, not the employee name in the badge
-        required_elements = [
-            "Python",         # Learning topic (partial match, case insensitive)
-            "Branding Pioneers"  # Company name should be mentioned
-        ]
-        
-        missing_elements = []
-        for element in required_elements:
-            if element.lower() not in linkedin_post.lower():
-                missing_elements.append(element)
+        found = {match.lower() for match in LINKEDIN_REQUIRED_RE.findall(linkedin_post)}
+        missing_elements = [element for element in LINKEDIN_REQUIRED_ELEMENTS if element.lower() not in found]
         
         # Check for hashtags (optional - AI might not always include them)
         has_hashtags = "#" in linkedin_post
@@ -682,199 +845,165 @@ class BackendTester:
         
         return True
 
-    def test_create_employee_profile(self):
+    @http_test("Create Employee Profile", "Failed to create employee profile", None)
+    async def test_create_employee_profile(self):
         """Test creating employee profile (required for recommendations)"""
         # Create a fresh user session for profile testing (since logout test cleared the session)
-        test_data = {"name": "John Doe"}
+        http = self.user_http or new_session()
         try:
-            response = requests.post(
-                f"{API_BASE_URL}/auth/login",
-                json=test_data,
-                headers={"Content-Type": "application/json"},
+            response = await http.post(
+                URL.LOGIN,
+                content=USER_LOGIN_BODY,
                 timeout=10
             )
             if response.status_code == 200:
-                self.user_session = response.cookies.get('session_token')
+                self.user_http = http
             else:
                 self.log_test("Create Employee Profile", False, "Failed to create user session for profile test")
                 return None
         except Exception as e:
             self.log_test("Create Employee Profile", False, f"Failed to login for profile test: {str(e)}")
             return None
+        finally:
+            if self.user_http is not http:
+                await http.aclose()
 
-        profile_data = {
-            "full_name": "John Doe",
-            "position": "Senior Software Engineer",
-            "department": "Engineering",
-            "date_of_joining": "2023-01-15T00:00:00Z",
-            "existing_skills": ["Python", "JavaScript", "React", "FastAPI", "MongoDB"],
-            "learning_interests": ["Machine Learning", "AI Development", "Cloud Architecture", "DevOps"]
-        }
-        
-        try:
-            cookies = {'session_token': self.user_session}
-            response = requests.post(
-                f"{API_BASE_URL}/profile",
-                json=profile_data,
-                cookies=cookies,
-                headers={"Content-Type": "application/json"},
-                timeout=10
-            )
+        response = await self.user_http.post(
+            URL.PROFILE,
+            content=PROFILE_BODY,
+            timeout=10
+        )
+        
+        if response.status_code == 200:
+            data = parse_json(response)
+            missing_fields = sorted(PROFILE_FIELDS - data.keys())
             
-            if response.status_code == 200:
-                data = response.json()
-                required_fields = ["id", "user_id", "full_name", "position", "department", "existing_skills", "learning_interests"]
-                missing_fields = [field for field in required_fields if field not in data]
-                
-                if not missing_fields:
-                    self.log_test("Create Employee Profile", True, 
-                                "Employee profile created successfully with all required fields",
-                                f"Profile ID: {data.get('id')}, Skills: {len(data.get('existing_skills', []))}, Interests: {len(data.get('learning_interests', []))}")
-                    return data
-                else:
-                    self.log_test("Create Employee Profile", False,
-                                f"Profile response missing fields: {missing_fields}",
-                                f"Available fields: {list(data.keys())}")
-                    return None
-            elif response.status_code == 400:
-                # Profile might already exist, try to get it
-                try:
-                    get_response = requests.get(
-                        f"{API_BASE_URL}/profile",
-                        cookies=cookies,
-                        timeout=10
-                    )
-                    if get_response.status_code == 200:
-                        data = get_response.json()
-                        self.log_test("Create Employee Profile", True, 
-                                    "Employee profile already exists - retrieved existing profile",
-                                    f"Profile ID: {data.get('id')}, Skills: {len(data.get('existing_skills', []))}")
-                        return data
-                except:
-                    pass
-                
-                self.log_test("Create Employee Profile", False,
-                            f"Profile creation failed with status {response.status_code}",
-                            response.text)
-                return None
+            if not missing_fields:
+                self.log_test("Create Employee Profile", True, 
+                            "Employee profile created successfully with all required fields",
+                            f"Profile ID: {data.get('id')}, Skills: {len(data.get('existing_skills', []))}, Interests: {len(data.get('learning_interests', []))}")
+                return data
             else:
                 self.log_test("Create Employee Profile", False,
-                            f"Profile creation failed with status {response.status_code}",
-                            response.text)
+                            f"Profile response missing fields: {missing_fields}",
+                            f"Available fields: {list(data.keys())}")
                 return None
-                
-        except Exception as e:
+        elif response.status_code == 400:
+            # Profile might already exist, try to get it
+            try:
+                get_response = await self.user_http.get(
+                    URL.PROFILE,
+                    timeout=10
+                )
+                if get_response.status_code == 200:
+                    data = parse_json(get_response)
+                    self.log_test("Create Employee Profile", True, 
+                                "Employee profile already exists - retrieved existing profile",
+                                f"Profile ID: {data.get('id')}, Skills: {len(data.get('existing_skills', []))}")
+                    return data
+            except:
+                pass
+            
+            self.log_test("Create Employee Profile", False,
+                        f"Profile creation failed with status {response.status_code}",
+                        response.text)
+            return None
+        else:
             self.log_test("Create Employee Profile", False,
-                        f"Failed to create employee profile: {str(e)}")
+                        f"Profile creation failed with status {response.status_code}",
+                        response.text)
             return None
 
-    def test_get_ai_recommendations(self):
+    @http_test("AI Recommendations (GET)", "Failed to get AI recommendations", None)
+    async def test_get_ai_recommendations(self):
         """Test GET /api/recommendations endpoint for AI-powered recommendations"""
-        if not self.user_session:
+        if self.user_http is None:
             self.log_test("AI Recommendations (GET)", False, "No user session available for testing")
             return None
             
-        try:
-            cookies = {'session_token': self.user_session}
-            response = requests.get(
-                f"{API_BASE_URL}/recommendations",
-                cookies=cookies,
-                timeout=30  # AI generation might take longer
-            )
+        response = await self.get_recommendations()
+        
+        if response.status_code == 200:
+            self.recommendations_digest = body_digest(response)
+            self.recommendations_etag = response.headers.get("ETag")
+            data = parse_json(response)
+            missing_fields = sorted(RECOMMENDATIONS_FIELDS - data.keys())
             
-            if response.status_code == 200:
-                data = response.json()
-                required_fields = ["paid_recommendations", "unpaid_recommendations", "total_count", "personalization_factors"]
-                missing_fields = [field for field in required_fields if field not in data]
+            if not missing_fields:
+                paid_count = len(data.get("paid_recommendations", []))
+                unpaid_count = len(data.get("unpaid_recommendations", []))
+                total_count = data.get("total_count", 0)
                 
-                if not missing_fields:
-                    paid_count = len(data.get("paid_recommendations", []))
-                    unpaid_count = len(data.get("unpaid_recommendations", []))
-                    total_count = data.get("total_count", 0)
-                    
-                    # Validate recommendation structure
-                    valid_recommendations = True
-                    sample_recommendation = None
-                    
-                    if paid_count > 0:
-                        sample_recommendation = data["paid_recommendations"][0]
-                        required_rec_fields = ["title", "description", "platform", "category", "difficulty_level", "reason"]
-                        missing_rec_fields = [field for field in required_rec_fields if field not in sample_recommendation]
-                        if missing_rec_fields:
-                            valid_recommendations = False
-                            self.log_test("AI Recommendations (GET)", False,
-                                        f"Recommendation structure invalid - missing fields: {missing_rec_fields}",
-                                        f"Sample recommendation keys: {list(sample_recommendation.keys())}")
-                            return None
-                    
-                    if valid_recommendations:
-                        self.log_test("AI Recommendations (GET)", True, 
-                                    f"AI recommendations retrieved successfully - {paid_count} paid, {unpaid_count} unpaid, total: {total_count}",
-                                    f"Personalization factors: {data.get('personalization_factors', [])}")
-                        return data
-                    else:
+                # Validate recommendation structure
+                valid_recommendations = True
+                sample_recommendation = None
+                
+                if paid_count > 0:
+                    sample_recommendation = data["paid_recommendations"][0]
+                    missing_rec_fields = sorted(RECOMMENDATION_ITEM_FIELDS - sample_recommendation.keys())
+                    if missing_rec_fields:
+                        valid_recommendations = False
+                        self.log_test("AI Recommendations (GET)", False,
+                                    f"Recommendation structure invalid - missing fields: {missing_rec_fields}",
+                                    f"Sample recommendation keys: {list(sample_recommendation.keys())}")
                         return None
+                
+                if valid_recommendations:
+                    self.log_test("AI Recommendations (GET)", True, 
+                                f"AI recommendations retrieved successfully - {paid_count} paid, {unpaid_count} unpaid, total: {total_count}",
+                                f"Personalization factors: {data.get('personalization_factors', [])}")
+                    return data
                 else:
-                    self.log_test("AI Recommendations (GET)", False,
-                                f"Recommendations response missing fields: {missing_fields}",
-                                f"Available fields: {list(data.keys())}")
                     return None
-            elif response.status_code == 404:
-                self.log_test("AI Recommendations (GET)", False,
-                            "User profile not found - profile required for recommendations",
-                            "Need to create employee profile first")
-                return None
             else:
                 self.log_test("AI Recommendations (GET)", False,
-                            f"Recommendations failed with status {response.status_code}",
-                            response.text)
+                            f"Recommendations response missing fields: {missing_fields}",
+                            f"Available fields: {list(data.keys())}")
                 return None
-                
-        except Exception as e:
+        elif response.status_code == 404:
+            self.log_test("AI Recommendations (GET)", False,
+                        "User profile not found - profile required for recommendations",
+                        "Need to create employee profile first")
+            return None
+        else:
             self.log_test("AI Recommendations (GET)", False,
-                        f"Failed to get AI recommendations: {str(e)}")
+                        f"Recommendations failed with status {response.status_code}",
+                        response.text)
             return None
 
-    def test_refresh_ai_recommendations(self):
+    @http_test("AI Recommendations Refresh", "Failed to refresh recommendations")
+    async def test_refresh_ai_recommendations(self):
         """Test POST /api/recommendations/refresh endpoint"""
-        if not self.user_session:
+        if self.user_http is None:
             self.log_test("AI Recommendations Refresh", False, "No user session available for testing")
             return False
             
-        try:
-            cookies = {'session_token': self.user_session}
-            response = requests.post(
-                f"{API_BASE_URL}/recommendations/refresh",
-                cookies=cookies,
-                timeout=30  # AI generation might take longer
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if "message" in data and "refresh" in data["message"].lower():
-                    self.log_test("AI Recommendations Refresh", True, 
-                                "Recommendations refresh successful - cache cleared and regenerated",
-                                f"Response: {data.get('message')}")
-                    return True
-                else:
-                    self.log_test("AI Recommendations Refresh", False,
-                                "Unexpected refresh response format",
-                                f"Response: {data}")
-                    return False
-            elif response.status_code == 404:
-                self.log_test("AI Recommendations Refresh", False,
-                            "User profile not found for refresh - profile required",
-                            "Need to create employee profile first")
-                return False
+        response = await self.user_http.post(
+            URL.RECOMMENDATIONS_REFRESH,
+            timeout=AI_TIMEOUT  # AI generation might take longer
+        )
+        
+        if response.status_code == 200:
+            data = parse_json(response)
+            if "message" in data and "refresh" in data["message"].lower():
+                self.log_test("AI Recommendations Refresh", True, 
+                            "Recommendations refresh successful - cache cleared and regenerated",
+                            f"Response: {data.get('message')}")
+                return True
             else:
                 self.log_test("AI Recommendations Refresh", False,
-                            f"Recommendations refresh failed with status {response.status_code}",
-                            response.text)
+                            "Unexpected refresh response format",
+                            f"Response: {data}")
                 return False
-                
-        except Exception as e:
+        elif response.status_code == 404:
+            self.log_test("AI Recommendations Refresh", False,
+                        "User profile not found for refresh - profile required",
+                        "Need to create employee profile first")
+            return False
+        else:
             self.log_test("AI Recommendations Refresh", False,
-                        f"Failed to refresh recommendations: {str(e)}")
+                        f"Recommendations refresh failed with status {response.status_code}",
+                        response.text)
             return False
 
     def test_ai_recommendation_quality(self, recommendations_data: Dict[Any, Any]):
@@ -890,32 +1019,8 @@ class BackendTester:
             self.log_test("AI Recommendation Quality", False, "No recommendations generated by AI")
             return False
         
-        # Test recommendation content quality
-        quality_issues = []
-        
-        # Check paid recommendations
-        for i, rec in enumerate(paid_recs):
-            if not rec.get("title") or len(rec.get("title", "")) < 10:
-                quality_issues.append(f"Paid rec {i+1}: Title too short or missing")
-            if not rec.get("description") or len(rec.get("description", "")) < 20:
-                quality_issues.append(f"Paid rec {i+1}: Description too short or missing")
-            if rec.get("category") != "paid":
-                quality_issues.append(f"Paid rec {i+1}: Category should be 'paid'")
-            if not rec.get("price"):
-                quality_issues.append(f"Paid rec {i+1}: Price missing for paid recommendation")
-            if not rec.get("reason") or len(rec.get("reason", "")) < 15:
-                quality_issues.append(f"Paid rec {i+1}: Reason too short or missing")
-        
-        # Check unpaid recommendations
-        for i, rec in enumerate(unpaid_recs):
-            if not rec.get("title") or len(rec.get("title", "")) < 10:
-                quality_issues.append(f"Unpaid rec {i+1}: Title too short or missing")
-            if not rec.get("description") or len(rec.get("description", "")) < 20:
-                quality_issues.append(f"Unpaid rec {i+1}: Description too short or missing")
-            if rec.get("category") != "unpaid":
-                quality_issues.append(f"Unpaid rec {i+1}: Category should be 'unpaid'")
-            if not rec.get("reason") or len(rec.get("reason", "")) < 15:
-                quality_issues.append(f"Unpaid rec {i+1}: Reason too short or missing")
+        # Test recommendation content quality, one pass per field
+        quality_issues = recommendation_quality_issues(paid_recs, unpaid_recs)
         
         if quality_issues:
             self.log_test("AI Recommendation Quality", False,
@@ -923,23 +1028,8 @@ class BackendTester:
                         f"Issues: {quality_issues[:3]}...")  # Show first 3 issues
             return False
         
-        # Check for personalization indicators
-        personalization_indicators = []
-        all_reasons = [rec.get("reason", "") for rec in paid_recs + unpaid_recs]
-        combined_reasons = " ".join(all_reasons).lower()
-        
-        # Look for signs of personalization
-        personal_keywords = ["your", "you", "based on", "given", "considering", "since you", "for your"]
-        for keyword in personal_keywords:
-            if keyword in combined_reasons:
-                personalization_indicators.append(keyword)
-        
-        # Check for skill/interest relevance
-        skill_keywords = ["python", "javascript", "machine learning", "ai", "cloud", "devops", "react", "fastapi"]
-        relevant_skills = []
-        for skill in skill_keywords:
-            if skill in combined_reasons:
-                relevant_skills.append(skill)
+        # Check for personalization indicators and skill/interest relevance
+        personalization_indicators, relevant_skills = reason_keywords(chain(paid_recs, unpaid_recs))
         
         self.log_test("AI Recommendation Quality", True,
                     f"AI recommendations show good quality - {len(paid_recs)} paid, {len(unpaid_recs)} unpaid",
@@ -961,253 +1051,441 @@ class BackendTester:
             return False
         
         # Check for signs of AI-generated content
-        ai_quality_indicators = []
-        
-        # Check for variety in platforms
-        platforms = set()
-        for rec in paid_recs + unpaid_recs:
-            platform = rec.get("platform", "").lower()
-            if platform:
-                platforms.add(platform)
-        
-        if len(platforms) >= 3:
-            ai_quality_indicators.append(f"Platform variety: {len(platforms)} different platforms")
-        
-        # Check for realistic difficulty levels
-        difficulty_levels = set()
-        for rec in paid_recs + unpaid_recs:
-            difficulty = rec.get("difficulty_level", "").lower()
-            if difficulty in ["beginner", "intermediate", "advanced"]:
-                difficulty_levels.add(difficulty)
-        
-        if len(difficulty_levels) >= 2:
-            ai_quality_indicators.append(f"Difficulty variety: {difficulty_levels}")
-        
-        # Check for realistic time estimates
-        time_estimates = []
-        for rec in paid_recs + unpaid_recs:
-            hours = rec.get("estimated_hours", 0)
-            if isinstance(hours, int) and 1 <= hours <= 100:
-                time_estimates.append(hours)
-        
-        if len(time_estimates) >= total_recs * 0.8:  # At least 80% have realistic time estimates
-            ai_quality_indicators.append(f"Realistic time estimates: {len(time_estimates)}/{total_recs}")
-        
-        # Check for proper URL structure
-        valid_urls = 0
-        for rec in paid_recs + unpaid_recs:
-            url = rec.get("url", "")
-            if url and ("http" in url or "www." in url or ".com" in url):
-                valid_urls += 1
-        
-        if valid_urls >= total_recs * 0.7:  # At least 70% have valid-looking URLs
-            ai_quality_indicators.append(f"Valid URLs: {valid_urls}/{total_recs}")
-        
-        if len(ai_quality_indicators) >= 3:
+        indicators = ai_quality_indicators(list(all_recommendations(recommendations_data)))
+        
+        if len(indicators) >= 3:
             self.log_test("Gemini API Integration", True,
                         f"Gemini API integration working correctly - generated {total_recs} quality recommendations",
-                        f"Quality indicators: {ai_quality_indicators}")
+                        f"Quality indicators: {indicators}")
             return True
         else:
             self.log_test("Gemini API Integration", False,
-                        f"Gemini API integration may have issues - low quality indicators: {len(ai_quality_indicators)}/4",
+                        f"Gemini API integration may have issues - low quality indicators: {len(indicators)}/4",
                         f"Generated {total_recs} recommendations but quality concerns exist")
             return False
 
-    def test_recommendations_caching(self):
+    async def get_recommendations(self):
+        """GET /api/recommendations on the user session"""
+        return await self.user_http.get(
+            URL.RECOMMENDATIONS,
+            timeout=AI_TIMEOUT  # AI generation might take longer
+        )
+
+    def build_recommendations_request(self, etag: Optional[str]) -> httpx.Request:
+        """GET /api/recommendations, conditional on etag when the server sent one"""
+        headers = {"If-None-Match": etag} if etag else None
+        return self.user_http.build_request("GET", URL.RECOMMENDATIONS, headers=headers, timeout=AI_TIMEOUT)
+
+    @http_test("Recommendations Caching", "Failed to test recommendations caching")
+    async def test_recommendations_caching(self, recommendations_data: Dict[Any, Any]):
         """Test that recommendations are properly cached in database"""
-        if not self.user_session:
+        if self.user_http is None:
             self.log_test("Recommendations Caching", False, "No user session available for testing")
             return False
+        if not recommendations_data:
+            self.log_test("Recommendations Caching", False, "No initial recommendations to compare against")
+            return False
         
-        try:
-            cookies = {'session_token': self.user_session}
-            
-            # First request - should generate new recommendations
-            response1 = requests.get(
-                f"{API_BASE_URL}/recommendations",
-                cookies=cookies,
-                timeout=30
-            )
-            
-            if response1.status_code != 200:
-                self.log_test("Recommendations Caching", False, "Failed to get initial recommendations for caching test")
-                return False
-            
-            # Second request immediately after - should use cached results (faster)
-            import time
-            start_time = time.time()
-            response2 = requests.get(
-                f"{API_BASE_URL}/recommendations",
-                cookies=cookies,
-                timeout=30
-            )
-            end_time = time.time()
+        # The first fetch generated the recommendations; replays should be served
+        # from the cache. Replays revalidate against the last ETag seen, so an
+        # unchanged set comes back as a bodyless 304 with nothing to compare.
+        # Build the request once (and again only when the ETag moves) so only
+        # the round trip is timed.
+        etag = self.recommendations_etag
+        request = self.build_recommendations_request(etag)
+        timings = []
+        digests = set()
+        not_modified = 0
+        last_body = None
+        for _ in range(CACHE_CHECK_REPLAYS):
+            start_time = time.perf_counter()
+            response = await self.user_http.send(request)
+            timings.append(time.perf_counter() - start_time)
             
-            if response2.status_code != 200:
+            if response.status_code == 304:
+                not_modified += 1
+                continue
+            if response.status_code != 200:
                 self.log_test("Recommendations Caching", False, "Failed to get cached recommendations")
                 return False
-            
-            # Compare response times (cached should be faster)
-            response_time = end_time - start_time
-            
-            # Compare content (should be identical for cached results)
-            data1 = response1.json()
-            data2 = response2.json()
-            
-            # Check if recommendations are identical (indicating caching)
-            recs1_titles = [rec.get("title") for rec in data1.get("paid_recommendations", []) + data1.get("unpaid_recommendations", [])]
-            recs2_titles = [rec.get("title") for rec in data2.get("paid_recommendations", []) + data2.get("unpaid_recommendations", [])]
-            
-            if recs1_titles == recs2_titles and len(recs1_titles) > 0:
-                self.log_test("Recommendations Caching", True,
-                            f"Recommendations caching working - identical results returned in {response_time:.2f}s",
-                            f"Cached {len(recs1_titles)} recommendations successfully")
-                return True
-            else:
+            digests.add(body_digest(response))
+            last_body = response
+            if response.headers.get("ETag") != etag:
+                etag = response.headers.get("ETag")
+                request = self.build_recommendations_request(etag)
+        
+        # Cached results skip the AI call, so even the slowest replay should be quick
+        p50 = statistics.median(timings)
+        p95 = statistics.quantiles(timings, n=20, method="inclusive")[18]
+        
+        # Compare content (should be identical for cached results). A 304 on
+        # every replay or byte-identical bodies settle it without parsing;
+        # otherwise (the first response is built before it is stored) compare
+        # the titles of the last full body.
+        recs1_titles = list(map(get_title, all_recommendations(recommendations_data)))
+        if not digests:
+            match = "unchanged"
+        elif digests == {self.recommendations_digest}:
+            match = "byte-identical results"
+        else:
+            recs2_titles = list(map(get_title, all_recommendations(parse_json(last_body))))
+            if recs1_titles != recs2_titles:
                 self.log_test("Recommendations Caching", False,
                             "Recommendations not properly cached - different results returned",
                             f"First: {len(recs1_titles)} recs, Second: {len(recs2_titles)} recs")
                 return False
-                
-        except Exception as e:
+            match = "results with the same titles"
+        match += f", {not_modified}/{len(timings)} revalidated with 304" if etag else ", no ETag so bodies compared"
+        
+        if len(recs1_titles) == 0:
             self.log_test("Recommendations Caching", False,
-                        f"Failed to test recommendations caching: {str(e)}")
+                        "Recommendations not properly cached - no recommendations to compare")
             return False
+        if p95 >= CACHED_RECOMMENDATIONS_MAX_SECONDS:
+            self.log_test("Recommendations Caching", False,
+                        f"Cached recommendations p95 {p95 * 1000:.0f}ms (limit {CACHED_RECOMMENDATIONS_MAX_SECONDS * 1000:.0f}ms)",
+                        "Identical results but too slow to have come from the cache")
+            return False
+        
+        self.log_test("Recommendations Caching", True,
+                    f"Recommendations caching working - {match}, p50 {p50 * 1000:.0f}ms / p95 {p95 * 1000:.0f}ms over {len(timings)} reads",
+                    f"Cached {len(recs1_titles)} recommendations successfully")
+        return True
 
-    def run_all_tests(self):
+    async def run_all_tests(self):
         """Run all backend tests"""
-        print("=" * 80)
-        print("BRANDING PIONEERS COMPREHENSIVE BACKEND API TESTING")
-        print("=" * 80)
-        print(f"Testing API at: {API_BASE_URL}")
-        print()
+        if not self.quiet:
+            logger.info(f"{'=' * 80}\nBRANDING PIONEERS COMPREHENSIVE BACKEND API TESTING\n{'=' * 80}\n"
+                        f"Testing API at: {API_BASE_URL}\n")
         
         # Test 1: API Health Check
-        if not self.test_api_health():
-            print("❌ API health check failed. Stopping tests.")
+        if not await self.test_api_health():
+            logger.error("❌ API health check failed. Stopping tests.")
             return self.get_summary()
         
-        print("\n" + "=" * 60)
-        print("AUTHENTICATION TESTING")
-        print("=" * 60)
-        
-        # Test 2: Admin Login (Arush T.)
-        admin_login_result = self.test_admin_login()
-        
-        # Test 3: Regular User Login (John Doe)
-        user_login_result = self.test_user_login()
-        
-        # Test 4: Auth Me Endpoint
-        self.test_auth_me_endpoint()
+        self.section("AUTHENTICATION TESTING")
+        
+        # Tests 2-3: Admin Login (Arush T.) and Regular User Login (John Doe),
+        # alongside the unauthenticated checks which need no session at all
+        await asyncio.gather(
+            self.test_admin_login(),
+            self.test_user_login(),
+            self.test_admin_stats_without_auth(),
+            self.test_badge_generation_without_auth(),
+        )
+        
+        # Everything below needs a session; with neither login working the
+        # environment is broken, so stop instead of failing each check in turn
+        if self.admin_http is None and self.user_http is None:
+            logger.error("❌ Admin and user login both failed. Skipping session-dependent tests.")
+            return self.get_summary()
         
-        # Test 5: Logout Endpoint
-        self.test_logout_endpoint()
+        self.section("ADMIN ACCESS CONTROL & BADGE GENERATION TESTING")
         
-        print("\n" + "=" * 60)
-        print("ADMIN ACCESS CONTROL TESTING")
-        print("=" * 60)
+        # Tests 4-12: everything that only needs the sessions from the logins above
+        # (logout waits for the recommendation chain, which logs back in)
+        *_, badge_response = await asyncio.gather(
+            self.test_auth_me_endpoint(),
+            self.test_admin_stats_with_admin(),
+            self.test_admin_stats_with_user(),
+            *(self.test_admin_list_endpoint(*endpoint) for endpoint in ADMIN_LIST_ENDPOINTS),
+            self.test_badge_generation_with_auth(),
+        )
         
-        # Test 6: Admin Stats with Admin Session
-        self.test_admin_stats_with_admin()
+        self.section("BADGE OUTPUT & AI-POWERED RECOMMENDATIONS TESTING")
         
-        # Test 7: Admin Stats with User Session (should fail)
-        self.test_admin_stats_with_user()
+        # Tests 14-22: the badge checks and the recommendation chain share no state
+        await asyncio.gather(
+            self.run_badge_output_tests(badge_response),
+            self.run_recommendation_tests(),
+        )
         
-        # Test 8: Admin Stats without Authentication (should fail)
-        self.test_admin_stats_without_auth()
+        return self.get_summary()
+
+    async def run_badge_output_tests(self, badge_response: Optional[Dict[Any, Any]]):
+        """Validate the generated badge and post (Tests 14-16)"""
+        if not badge_response:
+            logger.error("❌ Badge generation with auth failed. Skipping dependent tests.")
+            return
         
-        # Test 9: Admin Users Endpoint
-        self.test_admin_users_endpoint()
+        # Test 14: SVG Badge Generation
+        await self.test_svg_badge_generation(badge_response)
         
-        # Test 10: Admin Badges Endpoint
-        self.test_admin_badges_endpoint()
+        # Test 15: LinkedIn Post Generation
+        self.test_linkedin_post_generation(badge_response)
         
-        # Test 11: Admin Actions Endpoint
-        self.test_admin_actions_endpoint()
+        # Test 16: Response Format
+        self.test_response_format(badge_response)
+
+    async def run_recommendation_tests(self):
+        """Run the logout -> profile -> recommendations chain (Tests 17-22) in order"""
+        # Logout ends the user session the checks above shared; the profile
+        # test logs back in, so it has to finish first
+        await self.test_logout_endpoint()
         
-        print("\n" + "=" * 60)
-        print("BADGE GENERATION WITH AUTH TESTING")
-        print("=" * 60)
+        # Test 17: Create Employee Profile (required for recommendations)
+        profile_result = await self.test_create_employee_profile()
         
-        # Test 12: Badge Generation with Authentication
-        badge_response = self.test_badge_generation_with_auth()
+        if not profile_result:
+            logger.error("❌ Employee profile creation failed. Skipping AI recommendations tests.")
+            return
         
-        # Test 13: Badge Generation without Authentication (should fail)
-        self.test_badge_generation_without_auth()
+        # Test 18: Get AI Recommendations (fetched once, shared by the checks below)
+        recommendations_result = await self.test_get_ai_recommendations()
         
-        # Test 14: SVG Badge Generation (if we got a response)
-        if badge_response:
-            self.test_svg_badge_generation(badge_response)
+        # Test 19: AI Recommendation Quality (if we got recommendations)
+        if recommendations_result:
+            self.test_ai_recommendation_quality(recommendations_result)
             
-            # Test 15: LinkedIn Post Generation
-            self.test_linkedin_post_generation(badge_response)
-            
-            # Test 16: Response Format
-            self.test_response_format(badge_response)
-        else:
-            print("❌ Badge generation with auth failed. Skipping dependent tests.")
-        
-        print("\n" + "=" * 60)
-        print("AI-POWERED RECOMMENDATIONS SYSTEM TESTING")
-        print("=" * 60)
+            # Test 20: Gemini API Integration Quality
+            self.test_gemini_api_integration(recommendations_result)
         
-        # Test 17: Create Employee Profile (required for recommendations)
-        profile_result = self.test_create_employee_profile()
+        # Test 21: Recommendations Caching (before refresh replaces the cached set)
+        await self.test_recommendations_caching(recommendations_result)
         
-        if profile_result:
-            # Test 18: Get AI Recommendations
-            recommendations_result = self.test_get_ai_recommendations()
-            
-            # Test 19: Refresh AI Recommendations
-            self.test_refresh_ai_recommendations()
-            
-            # Test 20: AI Recommendation Quality (if we got recommendations)
-            if recommendations_result:
-                self.test_ai_recommendation_quality(recommendations_result)
-                
-                # Test 21: Gemini API Integration Quality
-                self.test_gemini_api_integration(recommendations_result)
-            
-            # Test 22: Recommendations Caching
-            self.test_recommendations_caching()
-        else:
-            print("❌ Employee profile creation failed. Skipping AI recommendations tests.")
-        
-        return self.get_summary()
+        # Test 22: Refresh AI Recommendations
+        await self.test_refresh_ai_recommendations()
 
     def get_summary(self):
         """Get test summary"""
-        print("=" * 80)
-        print("TEST SUMMARY")
-        print("=" * 80)
-        print(f"Total Tests: {self.passed_tests + self.failed_tests}")
-        print(f"Passed: {self.passed_tests}")
-        print(f"Failed: {self.failed_tests}")
-        print()
-        
+        lines = ["=" * 80, "TEST SUMMARY", "=" * 80]
+        if self.quiet:
+            lines += [f"{'✅ PASS' if passed else '❌ FAIL'}: {name}" for name, passed in zip(self.result_names, self.result_status)]
+            lines.append("")
+        total = self.passed_tests + self.failed_tests
+        lines += [
+            f"Total Tests: {total}",
+            f"Passed: {self.passed_tests}",
+            f"Failed: {self.failed_tests}",
+            "",
+        ]
         if self.failed_tests > 0:
-            print("FAILED TESTS:")
-            for result in self.test_results:
-                if "❌" in result['status']:
-                    print(f"  - {result['test']}: {result['message']}")
-            print()
+            lines.append("FAILED TESTS:")
+            lines += [f"  - {self.result_names[i]}: {self.result_messages[i]}" for i in self.failed_indices]
+            lines.append("")
+        logger.info("\n".join(lines))
+        output_handler.flush()
         
         return {
-            'total_tests': self.passed_tests + self.failed_tests,
+            'total_tests': total,
             'passed': self.passed_tests,
             'failed': self.failed_tests,
-            'success_rate': self.passed_tests / (self.passed_tests + self.failed_tests) * 100 if (self.passed_tests + self.failed_tests) > 0 else 0,
-            'results': self.test_results
+            'success_rate': 100.0 * self.passed_tests / (total or 1),
+            'results': {
+                'test': self.result_names,
+                'passed': self.result_status,
+                'message': self.result_messages,
+                'details': self.result_details,
+            }
         }
 
-if __name__ == "__main__":
+# pytest entry points. `pytest backend_test.py` runs the same checks as the
+# script, one test each; with pytest-xdist (`-n auto --dist=loadgroup`) they
+# are spread across workers. The server keeps a single session token per
+# user, so a second login as the same user revokes the first: every test
+# that needs the admin or user login shares one xdist group, and so one
+# worker and one pair of logins. Only the anonymous checks, the throwaway
+# logout and the unit tier spread out.
+SESSION_GROUP = pytest.mark.xdist_group("sessions")
+
+@pytest.fixture(scope="session")
+def run():
+    """Run a coroutine to completion on this worker's event loop"""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+    # Write out buffered results while pytest's captured stdout is still open
+    output_handler.flush()
+
+@pytest.fixture(scope="session")
+def tester(run):
+    """Shared BackendTester; skips everything when no backend is listening"""
     tester = BackendTester()
-    summary = tester.run_all_tests()
+    try:
+        run(tester.session.get(URL.ROOT, timeout=FAST_TIMEOUT))
+    except httpx.TransportError as e:
+        run(tester.close())
+        pytest.skip(f"Backend API not reachable at {API_BASE_URL}: {e}")
+    yield tester
+    run(tester.close())
+
+def check(tester: BackendTester, result):
+    """Fail the current test with the message its check logged"""
+    assert result, tester.result_messages[-1]
+    return result
+
+@pytest.fixture(scope="session")
+def admin(run, tester):
+    check(tester, run(tester.test_admin_login()))
+    return tester
+
+@pytest.fixture(scope="session")
+def user(run, tester):
+    check(tester, run(tester.test_user_login()))
+    return tester
+
+@pytest.fixture(scope="session")
+def badge(run, admin):
+    return check(admin, run(admin.test_badge_generation_with_auth()))
+
+@pytest.fixture(scope="session")
+def profile(run, user):
+    return check(user, run(user.test_create_employee_profile()))
+
+@pytest.fixture(scope="session")
+def recommendations(run, profile, user):
+    return check(user, run(user.test_get_ai_recommendations()))
+
+# Unit tier (`pytest backend_test.py -m unit`): the anonymous rejections and
+# the badge output checks run against canned responses that follow the API
+# contract, so they need no backend and never open a socket.
+MOCK_BADGE_URL = "/api/badge/0123456789abcdef.svg"
+MOCK_BADGE = {
+    "badgeUrl": MOCK_BADGE_URL,
+    "linkedinPost": (
+        "Proud to share that I just completed Advanced Python data structures and algorithms "
+        "as part of the learning program at Branding Pioneers. Sorting, graphs and dynamic "
+        "programming now feel far less intimidating. #Python #Learning"
+    ),
+}
+MOCK_BADGE_SVG = (
+    b'<svg xmlns="http://www.w3.org/2000/svg" width="400" height="200">'
+    b'<text>BRANDING PIONEERS</text><text>Sarah Johnson</text><text>Moderate</text></svg>'
+)
+
+def mock_backend(request: httpx.Request) -> httpx.Response:
+    """Answer the anonymous session's requests the way the real API does"""
+    route = (request.method, request.url.path)
+    if route in {("GET", "/api/admin/stats"), ("POST", "/api/generate")}:
+        return httpx.Response(401, json={"detail": "Authentication required"})
+    if route == ("GET", MOCK_BADGE_URL):
+        return httpx.Response(200, content=MOCK_BADGE_SVG, headers={"Content-Type": "image/svg+xml"})
+    return httpx.Response(404, json={"detail": "Not Found"})
+
+@pytest.fixture(scope="session")
+def mocked(run):
+    """BackendTester whose anonymous session is served by mock_backend"""
+    tester = BackendTester(session=httpx.AsyncClient(transport=httpx.MockTransport(mock_backend)))
+    yield tester
+    run(tester.close())
+
+@pytest.mark.unit
+def test_admin_stats_without_auth_mocked(run, mocked):
+    check(mocked, run(mocked.test_admin_stats_without_auth()))
+
+@pytest.mark.unit
+def test_badge_generation_without_auth_mocked(run, mocked):
+    check(mocked, run(mocked.test_badge_generation_without_auth()))
+
+@pytest.mark.unit
+def test_svg_badge_generation_mocked(run, mocked):
+    check(mocked, run(mocked.test_svg_badge_generation(MOCK_BADGE)))
+
+@pytest.mark.unit
+def test_linkedin_post_generation_mocked(mocked):
+    check(mocked, mocked.test_linkedin_post_generation(MOCK_BADGE))
+
+@pytest.mark.unit
+def test_response_format_mocked(mocked):
+    check(mocked, mocked.test_response_format(MOCK_BADGE))
+
+def test_api_health(run, tester):
+    check(tester, run(tester.test_api_health()))
+
+@SESSION_GROUP
+def test_admin_login(admin):
+    assert admin.admin_http is not None
+
+@SESSION_GROUP
+def test_user_login(user):
+    assert user.user_http is not None
+
+@SESSION_GROUP
+def test_auth_me_endpoint(run, admin):
+    check(admin, run(admin.test_auth_me_endpoint()))
+
+def test_logout_endpoint(run, tester):
+    # Log out a throwaway user: logging John Doe in again would replace the
+    # token the shared user fixture holds, and logout would then revoke it
+    other = BackendTester()
+    try:
+        other.user_http = new_session()
+        response = run(other.user_http.post(URL.LOGIN, content=LOGOUT_LOGIN_BODY, timeout=10))
+        assert response.status_code == 200, f"Throwaway login failed with status {response.status_code}"
+        check(other, run(other.test_logout_endpoint()))
+    finally:
+        run(other.close())
+
+@SESSION_GROUP
+def test_admin_stats_with_admin(run, admin):
+    check(admin, run(admin.test_admin_stats_with_admin()))
+
+@SESSION_GROUP
+def test_admin_stats_with_user(run, user):
+    check(user, run(user.test_admin_stats_with_user()))
+
+def test_admin_stats_without_auth(run, tester):
+    check(tester, run(tester.test_admin_stats_without_auth()))
+
+@SESSION_GROUP
+@pytest.mark.parametrize("endpoint", ADMIN_LIST_ENDPOINTS, ids=lambda endpoint: endpoint[2])
+def test_admin_list_endpoint(run, admin, endpoint):
+    check(admin, run(admin.test_admin_list_endpoint(*endpoint)))
+
+@SESSION_GROUP
+def test_badge_generation_with_auth(badge):
+    assert badge
+
+def test_badge_generation_without_auth(run, tester):
+    check(tester, run(tester.test_badge_generation_without_auth()))
+
+@SESSION_GROUP
+def test_svg_badge_generation(run, tester, badge):
+    check(tester, run(tester.test_svg_badge_generation(badge)))
+
+@SESSION_GROUP
+def test_linkedin_post_generation(tester, badge):
+    check(tester, tester.test_linkedin_post_generation(badge))
+
+@SESSION_GROUP
+def test_response_format(tester, badge):
+    check(tester, tester.test_response_format(badge))
+
+@SESSION_GROUP
+def test_create_employee_profile(profile):
+    assert profile
+
+@SESSION_GROUP
+def test_get_ai_recommendations(recommendations):
+    assert recommendations
+
+@SESSION_GROUP
+def test_ai_recommendation_quality(user, recommendations):
+    check(user, user.test_ai_recommendation_quality(recommendations))
+
+@SESSION_GROUP
+def test_gemini_api_integration(user, recommendations):
+    check(user, user.test_gemini_api_integration(recommendations))
+
+@SESSION_GROUP
+def test_recommendations_caching(run, user, recommendations):
+    check(user, run(user.test_recommendations_caching(recommendations)))
+
+@SESSION_GROUP
+def test_refresh_ai_recommendations(run, user, recommendations):
+    # Last in the chain: refreshing replaces the set the checks above compare
+    check(user, run(user.test_refresh_ai_recommendations()))
+
+async def main():
+    async with BackendTester() as tester:
+        return await tester.run_all_tests()
+
+if __name__ == "__main__":
+    summary = asyncio.run(main())
     
     if summary['failed'] == 0:
-        print("🎉 All tests passed! Backend API is working correctly.")
+        logger.info("🎉 All tests passed! Backend API is working correctly.")
         exit(0)
     else:
-        print(f"⚠️  {summary['failed']} test(s) failed. Check the details above.")
+        logger.info(f"⚠️  {summary['failed']} test(s) failed. Check the details above.")
         exit(1)
\ No newline at end of file
@@ -5,6 +5,9 @@ import "../styles/AdminDashboard.css";
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Older generations stored inline data URLs; newer ones point at the badge endpoint
+const badgeSrc = (badgeUrl) => badgeUrl.startsWith('data:') ? badgeUrl : `${BACKEND_URL}${badgeUrl}`;
+
 function AdminDashboard() {
   const [activeTab, setActiveTab] = useState('overview');
   const [stats, setStats] = useState(null);
@@ -218,7 +221,7 @@ function AdminDashboard() {
                 <div key={badge.id} className="badge-card">
                   <div className="badge-image-container">
                     <img
-                      src={badge.badge_url}
+                      src={badgeSrc(badge.badge_url)}
                       alt="Badge"
                       className="badge-thumbnail"
                     />
@@ -137,7 +137,7 @@ function BadgeGenerator() {
                 <h3 className="section-title">Your Learning Badge</h3>
                 <div className="badge-container">
                   <img 
-                    src={result.badgeUrl} 
+                    src={`${BACKEND_URL}${result.badgeUrl}`} 
                     alt="Learning Achievement Badge" 
                     className="badge-image"
                   />
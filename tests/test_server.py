@@ -0,0 +1,93 @@
+"""In-process checks of backend/server.py helpers; no MongoDB or Gemini needed"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+def test_gemini_generate_survives_leader_cancel(monkeypatch):
+    """A client that disconnects first must not abort the others sharing its call"""
+    calls = []
+    release = asyncio.Event()
+
+    async def fake_request(employee_name, learning, difficulty):
+        calls.append(employee_name)
+        await release.wait()
+        return "badge", "post"
+
+    monkeypatch.setattr(server, "gemini_request", fake_request)
+    monkeypatch.setattr(server, "gemini_cache", {})
+    monkeypatch.setattr(server, "gemini_inflight", {})
+
+    async def scenario():
+        leader = asyncio.create_task(server.gemini_generate("Ann", "Graphs", "Easy"))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(server.gemini_generate(" ann ", "graphs", "Easy"))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await follower == ("badge", "post")
+        assert leader.cancelled()
+
+    asyncio.run(scenario())
+    assert calls == ["Ann"]
+    assert server.gemini_cache[("ann", "graphs", "Easy")] == ("badge", "post")
+    assert server.gemini_inflight == {}
+
+
+def test_generate_stream_busy_is_429(monkeypatch):
+    """A full Gemini semaphore refuses the stream before any 200 is sent"""
+    async def fake_user(session_token, fresh=False):
+        return {"id": "u1", "name": "Ann"}
+
+    monkeypatch.setattr(server, "GEMINI_API_KEY", "key")
+    monkeypatch.setattr(server, "find_session_user", fake_user)
+    monkeypatch.setattr(server, "gemini_cache", {})
+
+    async def scenario():
+        monkeypatch.setattr(server.app.state, "gemini_semaphore", asyncio.Semaphore(0), raising=False)
+        request = server.GenerateRequest(employeeName="Ann", learning="Graphs and trees", difficulty="Easy")
+        try:
+            await server.generate_badge_and_post_stream(request, session_token="token")
+        except server.HTTPException as e:
+            return e
+        raise AssertionError("expected a 429")
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 429
+    assert error.headers == {"Retry-After": "1"}
+
+
+def test_parse_ai_recommendations_sections():
+    """Free and paid items land in their own sections despite the shared marker suffix"""
+    ai_response = """UNPAID_RESOURCES:
+Title: Python Graphs
+Platform: YouTube
+Description: Free walkthrough of graph algorithms.
+Reason: Builds on the graphs milestone
+---
+Title: Dynamic Programming Notes
+Platform: GitHub
+Description: Worked examples.
+Reason: Adjacent skill
+---
+
+PAID_RESOURCES:
+Title: Algorithms Specialization
+Platform: Coursera
+Description: Four-course algorithms series.
+Price: $49/month
+Reason: Deepens algorithm design
+---
+"""
+    parsed = server.parse_ai_recommendations(ai_response)
+
+    assert [item.title for item in parsed["unpaid"]] == ["Python Graphs", "Dynamic Programming Notes"]
+    assert [item.title for item in parsed["paid"]] == ["Algorithms Specialization"]
+    assert parsed["paid"][0].price == "$49/month"